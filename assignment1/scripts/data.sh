@@ -1,4 +1,3 @@
 #!/bin/bash
-for n in {"1000","5000","10000","50000","100000","500000"}; do
-    python3 ../sources/inst_gen.py -s $n -n 5
-done
+# generate the examples in parallel, skipping those already generated
+python3 ../../generate.py -a tp1 --out . "$@"
@@ -2,15 +2,18 @@
 ALGO=""
 EXAMPLE_FILE=""
 OPTIONS=""
+JOBS=""
 
-while getopts "a:e:pt" FLAG;
+while getopts "a:e:j:pit" FLAG;
 do
   case "${FLAG}" in
     a)
       ALGO="${OPTARG}";;
     e) 
       EXAMPLE_FILE="${OPTARG}";;
-    p | t) 
+    j)
+      JOBS="-j ${OPTARG}";;
+    p | t | i) 
       OPTIONS+="${FLAG}";;
     ?)
       echo "ERROR : Wrong option."
@@ -22,4 +25,4 @@ if [ ! -z "${OPTIONS}" ]; then
   OPTIONS="-${OPTIONS}"
 fi
 
-python3 ../sources/skyline.py -a $ALGO -e $EXAMPLE_FILE $OPTIONS
+python3 ../sources/skyline.py -a $ALGO -e $EXAMPLE_FILE $OPTIONS $JOBS
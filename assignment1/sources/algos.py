@@ -1,21 +1,40 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Iterable, Iterator, Tuple
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+import heapq
+import numpy as np
+from points import SkylinePoints
 
 # Interface for algorithm
 class IAlgo(ABC) :
     @abstractmethod
-    def solve(self, buildings: List[List[int]]) -> List[List[int]] :
+    def solve(self, buildings: List[List[int]]) -> SkylinePoints :
         pass
 
+    def get_critical_points(self, buildings: List[List[int]]) -> List[List[int]] :
+        # For each building, we mark its critical points
+        critical_points = []
+        for x1, x2, height in buildings :
+            critical_points.append([x1, height])
+            critical_points.append([x2, 0])
+        critical_points.sort()
+        return critical_points
+
 # Naive algorithm
 class NaiveAlgo(IAlgo) :
-    def solve(self, buildings: List[List[int]]) -> List[List[int]] :
+    def solve(self, buildings: List[List[int]]) -> SkylinePoints :
+        solution_x, solution_h = self.skyline(buildings)
+        return SkylinePoints(array('q', solution_x), array('q', solution_h))
+
+    # This method returns the abscissas and heights of the skyline as two lists
+    def skyline(self, buildings: List[List[int]]) -> Tuple[List[int], List[int]] :
         # Naive algo
-        solution = []
+        solution_x, solution_h = [], []
         critical_points = self.get_critical_points(buildings)
         # Loop through critical points
-        for critical_point in critical_points :
-            critical_x, critical_y = critical_point
+        for critical_x, critical_y in critical_points :
 
             # Loop through buildings
             for building in buildings :
@@ -32,23 +51,140 @@ class NaiveAlgo(IAlgo) :
             
             # If the solution is not empty, verify redundancy with last point of solution
             # Else, add the point to the solution
-            if not solution or solution[-1][1] != critical_y : 
-                solution.append([critical_x, critical_y])
+            if not solution_h or solution_h[-1] != critical_y : 
+                solution_x.append(critical_x)
+                solution_h.append(critical_y)
+        return solution_x, solution_h
+
+# Sweep line algorithm
+class SweepLineAlgo(IAlgo) :
+    def solve(self, buildings: List[List[int]]) -> SkylinePoints :
+        solution = SkylinePoints()
+        # Max-heap of active buildings as (-height, x2), buildings which
+        #   already ended are only removed once they reach the top (lazy deletion)
+        active = []
+        idx = 0
+        n = len(buildings)
+        ordered = sorted(buildings, key = lambda building : building[0])
+
+        # Loop through critical points
+        for critical_x, _ in self.get_critical_points(buildings) :
+            # Push buildings starting at or before the critical point
+            while idx < n and ordered[idx][0] <= critical_x :
+                x1, x2, height = ordered[idx]
+                heapq.heappush(active, (-height, x2))
+                idx += 1
+
+            # Pop buildings which do not contain the critical point anymore
+            while active and active[0][1] <= critical_x :
+                heapq.heappop(active)
+
+            critical_y = -active[0][0] if active else 0
+
+            # Verify redundancy with last point of solution
+            if not solution or solution.hs[-1] != critical_y :
+                solution.append(critical_x, critical_y)
         return solution
-    
-    def get_critical_points(self, buildings: List[List[int]]) -> List[List[int]] :
-        critical_points = []
-        # For each building, we mark its critical points
-        for building in buildings : 
-            x1, x2, height = building
-            critical_points.append([x1, height])
-            critical_points.append([x2, 0])
-        return sorted(critical_points)
+
+# Streaming algorithm, buildings must come in nondecreasing order of x1
+class StreamAlgo(IAlgo) :
+    def solve(self, buildings: Iterable[List[int]]) -> Iterator[List[int]] :
+        # The last critical point is held back until the sweep passes its abscissa,
+        #   otherwise it is replaced by the next one at the same abscissa
+        critical = None
+        height = 0
+        for x, y in self.sweep(buildings) :
+            if critical and critical[0] != x :
+                yield critical
+                height = critical[1]
+            critical = [x, y] if y != height else None
+        if critical :
+            yield critical
+
+    # This method sweeps the buildings and yields the height of the skyline
+    #   after each start or end of a building, buildings are kept in a max-heap
+    #   (-height, x2) with lazy deletion : an ended building stays in it until it
+    #   reaches the top. The ended buildings are filtered out of the heap once it
+    #   holds twice as many buildings as were live at the last filtering, so that
+    #   the heap never holds much more than twice the largest number of live
+    #   buildings, for an amortized O(1) cost per building
+    def sweep(self, buildings: Iterable[List[int]]) -> Iterator[Tuple[int, int]] :
+        active = []
+        live = 0
+        last_x1 = None
+        for x1, x2, height in buildings :
+            if last_x1 is not None and x1 < last_x1 :
+                raise ValueError('buildings must be sorted by increasing x1')
+            last_x1 = x1
+
+            # Ends of active buildings before the new building
+            while active and active[0][1] <= x1 :
+                yield self.pop_ended(active)
+
+            # Filter out the buildings ended before the new building
+            if len(active) > 2 * live + 16 :
+                active[:] = [building for building in active if building[1] > x1]
+                heapq.heapify(active)
+                live = len(active)
+
+            heapq.heappush(active, (-height, x2))
+            yield x1, -active[0][0]
+
+        while active :
+            yield self.pop_ended(active)
+
+    # This method removes the highest active building and all the buildings
+    #   ending before it, and returns its end with the resulting height
+    def pop_ended(self, active: List[Tuple[int, int]]) -> Tuple[int, int] :
+        end = active[0][1]
+        while active and active[0][1] <= end :
+            heapq.heappop(active)
+        return end, -active[0][0] if active else 0
+
+# Vectorized algorithm
+class NumpyAlgo(IAlgo) :
+    def solve(self, buildings: List[List[int]]) -> SkylinePoints :
+        buildings = np.asarray(buildings, dtype = np.int64).reshape(-1, 3)
+        if not len(buildings) :
+            return SkylinePoints()
+        x1, x2, height = buildings.T
+
+        # Sorted distinct abscissas of critical points, segment i is [xs[i], xs[i+1])
+        xs = np.sort(np.concatenate((x1, x2)))
+        xs = xs[np.concatenate(([True], np.diff(xs) != 0))]
+        lo = np.searchsorted(xs, x1)
+        hi = np.searchsorted(xs, x2)
+
+        # Each building covers segments lo..hi-1, which is the union of two
+        #   windows of length 2**level (as in a sparse table)
+        levels = np.floor(np.log2(hi - lo)).astype(np.int64)
+        n_segments = len(xs) - 1
+
+        # Record building heights on windows from the largest level down,
+        #   each level being pushed down to both halves of the level below
+        top = int(levels.max())
+        segment_max = np.zeros(n_segments, dtype = np.int64)
+        for level in range(top, -1, -1) :
+            if level < top :
+                half = 1 << level
+                pushed = segment_max.copy()
+                np.maximum(pushed[half:], segment_max[:-half], out = pushed[half:])
+                segment_max = pushed
+            selected = levels == level
+            np.maximum.at(segment_max, lo[selected], height[selected])
+            np.maximum.at(segment_max, hi[selected] - (1 << level), height[selected])
+
+        # Keep the critical points whose height differs from the previous one
+        heights = np.append(segment_max, 0)
+        keep = np.ones(len(xs), dtype = bool)
+        keep[1:] = np.diff(heights) != 0
+        return SkylinePoints(array('q', xs[keep].tobytes()), array('q', heights[keep].tobytes()))
 
 # Interface for Divide and Conquer algorithm
 class IDCAlgo(IAlgo) :
-    def __init__(self, threshold: int) -> None: 
+    def __init__(self, threshold: int, iterative: bool = False) -> None: 
         self._threshold = threshold
+        self._iterative = iterative
     
     @property
     def threshold(self) -> int :
@@ -57,58 +193,153 @@ class IDCAlgo(IAlgo) :
     @threshold.setter
     def threshold(self, threshold: int) -> None :
         self._threshold = threshold
+
+    @property
+    def iterative(self) -> bool :
+        return self._iterative
+
+    @iterative.setter
+    def iterative(self, iterative: bool) -> None :
+        self._iterative = iterative
         
+    # Partial skylines are kept as two lists, of abscissas and of heights, which
+    #   share the integers of the buildings and are much faster to index and
+    #   append to than arrays : the SkylinePoints of the solution is only built
+    #   once at the end
     @abstractmethod
-    def conquer(self, buildings: List[List[int]]) -> List[List[int]] :
+    def conquer(self, buildings: List[List[int]]) -> Tuple[List[int], List[int]] :
         pass
      
-    def merge(self, halves: List[List[List[int]]]) -> List[List[int]]:
-        merge_lst = list()
-        heights = [0]*2
-        idxs = [0]*2
-        sizes = len(halves[0]), len(halves[1])
-        critical = None
-        
-        while idxs[0] != sizes[0] or idxs[1] != sizes[1]:
-            # boolean which tells which half has the critical point of minimal abscissa
-            tst = idxs[1] != sizes[1] and \
-                    (idxs[0] == sizes[0] or halves[0][idxs[0]][0] > halves[1][idxs[1]][0])
-            
-            # remove critical point from the half given by the boolean tst
-            critical = halves[tst][idxs[tst]]
-            idxs[tst] += 1
-            heights[tst] = critical[1]
-            
-            # update the critical point to the maximum of heights
-            critical[1] = max(heights)
-            
+    def merge(self, halves: Tuple[Tuple[List[int], List[int]], Tuple[List[int], List[int]]]) -> Tuple[List[int], List[int]]:
+        merged_x, merged_h = [], []
+        (left_x, left_h), (right_x, right_h) = halves
+        left_size, right_size = len(left_x), len(right_x)
+        left_height = right_height = 0
+        idx_left = idx_right = 0
+
+        while idx_left != left_size or idx_right != right_size :
+            # take the critical point of minimal abscissa
+            if idx_right == right_size or (idx_left != left_size and left_x[idx_left] <= right_x[idx_right]) :
+                critical_x = left_x[idx_left]
+                left_height = left_h[idx_left]
+                idx_left += 1
+            else :
+                critical_x = right_x[idx_right]
+                right_height = right_h[idx_right]
+                idx_right += 1
+
+            # the height of the critical point is the maximum of heights
+            critical_y = left_height if left_height > right_height else right_height
+
             # verify redundancy before adding the critical point to the solution
-            if merge_lst and merge_lst[-1][0] == critical[0] :
-                merge_lst.pop()
-            if not merge_lst or merge_lst[-1][1] != critical[1] :
-                merge_lst.append(critical)
-        
-        return merge_lst
+            if merged_x and merged_x[-1] == critical_x :
+                merged_x.pop()
+                merged_h.pop()
+            if not merged_h or merged_h[-1] != critical_y :
+                merged_x.append(critical_x)
+                merged_h.append(critical_y)
+
+        return merged_x, merged_h
+
+    # Bottom-up divide and conquer : runs of threshold buildings are conquered
+    #   one after the other and pushed on a stack with their level, the two runs
+    #   on top being merged as long as they have the same level, as the carries
+    #   of a binary counter. The stack holds at most one run per level, so that
+    #   memory is the same as with the recursion, without its calls
+    def solve_iterative(self, buildings: List[List[int]]) -> SkylinePoints:
+        runs = []
+        for lo in range(0, len(buildings), self._threshold) :
+            run, level = self.conquer(buildings[lo:lo + self._threshold]), 0
+            while runs and runs[-1][0] == level :
+                run = self.merge((runs.pop()[1], run))
+                level += 1
+            runs.append((level, run))
+
+        if not runs :
+            return SkylinePoints()
+        # The runs left have decreasing levels and are merged from the top
+        _, (solution_x, solution_h) = runs.pop()
+        while runs :
+            solution_x, solution_h = self.merge((runs.pop()[1], (solution_x, solution_h)))
+        return SkylinePoints(array('q', solution_x), array('q', solution_h))
     
-    def solve(self, buildings: List[List[int]]) -> List[List[int]]:
+    def solve(self, buildings: List[List[int]]) -> SkylinePoints:
+        if self._iterative :
+            return self.solve_iterative(buildings)
+        if not buildings :
+            return SkylinePoints()
+        solution_x, solution_h = self.solve_recursive(buildings)
+        return SkylinePoints(array('q', solution_x), array('q', solution_h))
+
+    def solve_recursive(self, buildings: List[List[int]]) -> Tuple[List[int], List[int]]:
         n = len(buildings)
         if n <= self._threshold :
             return self.conquer(buildings)
         else:
-            halves = (self.solve(buildings[:(n+1)//2]), self.solve(buildings[(n+1)//2:]))
+            halves = (self.solve_recursive(buildings[:(n+1)//2]), self.solve_recursive(buildings[(n+1)//2:]))
             return self.merge(halves)
             
 
 # Divide and Conquer algorithm
 class DCAlgo(IDCAlgo) :
-    def __init__(self) -> None:
-        super().__init__(1)
+    def __init__(self, iterative: bool = False) -> None:
+        super().__init__(1, iterative)
 
-    def conquer(self, buildings: List[List[int]]) -> List[List[int]] :
-        return [[buildings[0][0], buildings[0][2]], [buildings[0][1], 0]]
+    def conquer(self, buildings: List[List[int]]) -> Tuple[List[int], List[int]] :
+        return [buildings[0][0], buildings[0][1]], [buildings[0][2], 0]
 
 # Divide and Conquer algorithm with threshold
 class DCThresAlgo(IDCAlgo) :
     naive_algo = NaiveAlgo()
-    def conquer(self, buildings: List[List[int]]) -> List[List[int]] :
-        return self.naive_algo.solve(buildings)
\ No newline at end of file
+    def conquer(self, buildings: List[List[int]]) -> Tuple[List[int], List[int]] :
+        return self.naive_algo.skyline(buildings)
+
+# This function solves a chunk of buildings given as a flat array (x1, x2, height, ...)
+#   and returns the arrays of abscissas and heights of its skyline, flat arrays
+#   being much cheaper to send between processes than lists of lists
+def solve_chunk(chunk: array, threshold: int) -> Tuple[array, array] :
+    buildings = [chunk[idx:idx + 3].tolist() for idx in range(0, len(chunk), 3)]
+    solution = DCThresAlgo(threshold).solve(buildings)
+    return solution.xs, solution.hs
+
+# This function merges two skylines given as arrays of abscissas and heights,
+#   in a worker process, with the list based merge of divide and conquer
+def merge_chunks(left: Tuple[array, array], right: Tuple[array, array]) -> Tuple[array, array] :
+    merged_x, merged_h = DCThresAlgo(1).merge(((left[0].tolist(), left[1].tolist()),
+                                                (right[0].tolist(), right[1].tolist())))
+    return array('q', merged_x), array('q', merged_h)
+
+# Parallel Divide and Conquer algorithm
+class ParallelDCAlgo(IAlgo) :
+    def __init__(self, threshold: int, jobs: int) -> None:
+        self._dc_algo = DCThresAlgo(threshold)
+        self._jobs = jobs
+
+    @property
+    def jobs(self) -> int :
+        return self._jobs
+
+    @jobs.setter
+    def jobs(self, jobs: int) -> None :
+        self._jobs = jobs
+
+    def solve(self, buildings: List[List[int]]) -> SkylinePoints :
+        n = len(buildings)
+        jobs = max(1, min(self._jobs, n))
+        if jobs == 1 :
+            return self._dc_algo.solve(buildings)
+
+        # Split the buildings into contiguous chunks solved in worker processes
+        cuts = [n * idx // jobs for idx in range(jobs + 1)]
+        chunks = [array('q', chain.from_iterable(buildings[lo:hi])) for lo, hi in zip(cuts, cuts[1:])]
+        with ProcessPoolExecutor(max_workers = jobs) as executor :
+            partials = list(executor.map(solve_chunk, chunks, [self._dc_algo.threshold] * jobs))
+
+            # Merge the partial skylines as a tree, the pairs of each level
+            #   being merged in the worker processes, an odd one being left as is
+            while len(partials) > 1 :
+                merged = list(executor.map(merge_chunks, partials[0:-1:2], partials[1::2]))
+                partials = merged + partials[len(merged) * 2:]
+
+        solution_x, solution_h = partials[0]
+        return SkylinePoints(solution_x, solution_h)
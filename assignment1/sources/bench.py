@@ -0,0 +1,145 @@
+import os
+import csv
+import sys
+import math
+import json
+import time
+import argparse
+import tracemalloc
+import calibration
+import loader
+from collections import deque
+from algos import IAlgo
+from skyline import ALGOS, create_algo
+from typing import List, Dict, Iterator, Tuple
+
+FIELDS = ['algo', 'size', 'instances', 'runs', 'median_ms', 'p95_ms', 'peak_kib']
+# The brute force and the recursive divide and conquer algorithms are only
+#   benchmarked when asked for, and the quadratic brute force algorithm is
+#   never run on more buildings than its maximum size (minutes per run above)
+DEFAULT_ALGOS = [algo for algo in ALGOS if algo not in ('brute', 'recursif')]
+MAX_SIZES = {'brute': 10000}
+
+# This method solves the buildings and consumes a streamed solution,
+#   so that its whole computation is measured
+def run(algo: IAlgo, buildings) -> None :
+    solution = algo.solve(buildings)
+    if isinstance(solution, Iterator) :
+        deque(solution, maxlen = 0)
+
+def median(values: List[float]) -> float :
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+# Nearest-rank percentile
+def percentile(values: List[float], rank: float) -> float :
+    values = sorted(values)
+    return values[max(0, math.ceil(rank * len(values)) - 1)]
+
+# This method returns the slope of the least squares fit of log(time) against log(size),
+#   that is the exponent k of time = c * size^k
+def fit_exponent(points: List[Tuple[int, float]]) -> float :
+    points = [(math.log(size), math.log(elapsed)) for size, elapsed in points if elapsed > 0]
+    if len(points) < 2 :
+        return float('nan')
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x :
+        return float('nan')
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+# This method times an algorithm on the examples of one size, with warmup runs
+#   and repetitions, then measures its peak memory in a separate traced run
+# tracemalloc only sees the memory of the current process, so the peak memory
+#   of the parallel algorithm leaves out the memory of its worker processes
+def bench(algo: IAlgo, examples: list, warmup: int, repeat: int) -> Dict[str, float] :
+    timings = []
+    peak = 0
+    for buildings in examples :
+        for _ in range(warmup) :
+            run(algo, buildings)
+        for _ in range(repeat) :
+            start_time = time.perf_counter()
+            run(algo, buildings)
+            timings.append((time.perf_counter() - start_time) * 1000)
+
+        tracemalloc.start()
+        run(algo, buildings)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {'instances': len(examples), 'runs': len(timings), 'median_ms': median(timings),
+            'p95_ms': percentile(timings, 0.95), 'peak_kib': peak / 1024}
+
+if __name__ == "__main__" :
+    # parse arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-a", \
+                        help="algorithms to benchmark (all but brute and recursif by default)", \
+                        dest="algos", \
+                        action='store', nargs='+', choices=ALGOS, default=DEFAULT_ALGOS)
+    parser.add_argument("--data", \
+                        help="data directory with the examples N<size>_<k>", \
+                        dest="data_dir", \
+                        action='store', default=calibration.DATA_DIR, metavar = 'DATA_DIR')
+    parser.add_argument("--max-size", \
+                        help="largest size to benchmark (at most 10000 for brute)", \
+                        dest="max_size", \
+                        action='store', type=int, default=100000)
+    parser.add_argument("--samples", \
+                        help="number of examples per size", \
+                        dest="samples", \
+                        action='store', type=int, default=5)
+    parser.add_argument("--warmup", \
+                        help="number of warmup runs per example", \
+                        dest="warmup", \
+                        action='store', type=int, default=1)
+    parser.add_argument("--repeat", \
+                        help="number of timed runs per example", \
+                        dest="repeat", \
+                        action='store', type=int, default=3)
+    parser.add_argument("-j", \
+                        help="number of processes for parallel algorithm", \
+                        dest="jobs", \
+                        action='store', type=int, default=os.cpu_count())
+    parser.add_argument("--json", \
+                        help="writes the results as JSON in this file", \
+                        dest="json_file", \
+                        action='store', metavar = 'FILE_JSON')
+    args = parser.parse_args()
+
+    # examples are loaded once, the numpy algorithm works on arrays
+    #   and the other algorithms on lists
+    examples = dict()
+    for size, files in calibration.find_examples(args.data_dir, args.samples).items() :
+        if size <= args.max_size :
+            arrays = [loader.load_buildings(example_file) for example_file in files]
+            examples[size] = (arrays, [array.tolist() for array in arrays])
+
+    writer = csv.DictWriter(sys.stdout, fieldnames = FIELDS)
+    writer.writeheader()
+    results = []
+    exponents = dict()
+    for name in args.algos :
+        points = []
+        for size, (arrays, lists) in examples.items() :
+            if size > MAX_SIZES.get(name, size) :
+                continue
+            algo = create_algo(name, calibration.load_threshold(size), jobs = args.jobs)
+            result = {'algo': name, 'size': size}
+            result.update(bench(algo, arrays if name == 'numpy' else lists, args.warmup, args.repeat))
+            writer.writerow(result)
+            sys.stdout.flush()
+            results.append(result)
+            points.append((size, result['median_ms']))
+        exponents[name] = fit_exponent(points)
+
+    for name, exponent in exponents.items() :
+        print(f'# {name} : time ~ size^{exponent:.2f}', file = sys.stderr)
+    if 'parallel' in args.algos :
+        print('# parallel : peak_kib leaves out the memory of the worker processes', file = sys.stderr)
+
+    if args.json_file :
+        with open(args.json_file, 'w') as f :
+            json.dump({'results': results, 'exponents': exponents}, f, indent = 2)
@@ -0,0 +1,68 @@
+import os
+import re
+import json
+import math
+import time
+import loader
+from algos import DCThresAlgo
+from typing import List, Dict
+
+DEFAULT_THRESHOLD = 20
+DEFAULT_THRESHOLDS = [1, 2, 4, 8, 12, 16, 20, 24, 32, 48, 64, 96, 128]
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.threshold_cache.json')
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+# This method groups the example files N<size>_<k> of a directory by size
+def find_examples(data_dir: str, samples: int) -> Dict[int, List[str]] :
+    examples = dict()
+    for name in sorted(os.listdir(data_dir)) :
+        match = re.fullmatch(r'N(\d+)_\d+', name)
+        if match :
+            examples.setdefault(int(match.group(1)), []).append(os.path.join(data_dir, name))
+    return {size: files[:samples] for size, files in sorted(examples.items())}
+
+# This method times DCThresAlgo over a sweep of thresholds on sample examples
+#   and returns the fastest threshold for each size class, that is where
+#   conquering with the naive algorithm stops beating merging
+def calibrate(data_dir: str = DATA_DIR, thresholds: List[int] = DEFAULT_THRESHOLDS,
+              samples: int = 1, repeats: int = 3, max_size: int = 50000) -> Dict[int, int] :
+    best_thresholds = dict()
+    for size, files in find_examples(data_dir, samples).items() :
+        if size > max_size :
+            continue
+        examples = [loader.load_buildings(example_file).tolist() for example_file in files]
+        timings = dict()
+        for threshold in thresholds :
+            algo = DCThresAlgo(threshold)
+            elapsed_time = 0
+            for buildings in examples :
+                # keep the best of several repetitions to filter out noise
+                runs = []
+                for _ in range(repeats) :
+                    start_time = time.perf_counter()
+                    algo.solve(buildings)
+                    runs.append(time.perf_counter() - start_time)
+                elapsed_time += min(runs)
+            timings[threshold] = elapsed_time
+        best_thresholds[size] = min(timings, key = timings.__getitem__)
+    return best_thresholds
+
+def save_thresholds(best_thresholds: Dict[int, int], cache_file: str = CACHE_FILE) -> None :
+    with open(cache_file, 'w') as f :
+        json.dump({str(size): threshold for size, threshold in best_thresholds.items()}, f, indent = 2)
+
+def load_thresholds(cache_file: str = CACHE_FILE) -> Dict[int, int] :
+    try :
+        with open(cache_file, 'r') as f :
+            return {int(size): threshold for size, threshold in json.load(f).items()}
+    except (OSError, ValueError) :
+        return dict()
+
+# This method returns the calibrated threshold of the size class closest
+#   (in logarithmic scale) to the given number of buildings
+def load_threshold(n: int, cache_file: str = CACHE_FILE) -> int :
+    best_thresholds = load_thresholds(cache_file)
+    if not best_thresholds or n <= 0 :
+        return DEFAULT_THRESHOLD
+    size = min(best_thresholds, key = lambda size : abs(math.log(size) - math.log(n)))
+    return best_thresholds[size]
@@ -12,9 +12,14 @@
 #
 #   USAGE :
 #     Ce script vérifie le format du fichier solution donné pour conformité avec les exigences du TP1 tel que rédigé à la session H22.
-#       $ ./check_sol.py -s FICHIER_SOLUTION
+#       $ ./check_sol.py -s FICHIER_SOLUTION [-e FICHIER_EXEMPLAIRE]
 #     où :
 #       * "FICHIER_SOLUTION" est l'adresse du fichier solution à l'emplaire donné au script
+#       * "FICHIER_EXEMPLAIRE" est l'adresse de l'exemplaire résolu. Si elle est donnée, la solution est
+#         comparée en O(n log n) à une solution de référence calculée par balayage, les deux fichiers
+#         étant lus au fil de l'eau, et le premier point différent est rapporté. Un exemplaire dont les
+#         bâtiments ne sont pas triés par x1 croissant est chargé en entier et trié avant le balayage.
+#         Un exemplaire au format non valide est rapporté avec le code de retour 2
 #
 #   EXEMPLES D'USAGE :
 #     $ ./tp.sh -a brute -e N5_0 -p > sol_N5_0
@@ -35,6 +40,9 @@ import sys
 import re
 import math
 import argparse
+import loader
+from itertools import zip_longest
+from algos import StreamAlgo, SweepLineAlgo
 
 def is_solution_format_valid(raw_solution):
     target_pattern = r"^(\d+\s+\d+\n)+\d+\s+\d+\s*$"
@@ -42,24 +50,77 @@ def is_solution_format_valid(raw_solution):
 
 
 def parse_solution(raw_solution):
-    solution_data = []
-
-    for line in raw_solution.splitlines():
-        if len(line.split()) == 2 :
-            solution_data.append([int(x) for x in line.split()])
-
-    return solution_data
+    return loader.parse_array(raw_solution.encode(), 2).tolist()
 
 def check_consistency(solution):
-    outpout_text = 'Solution obtenue :\n'
+    outpout_text = ['Solution obtenue :\n']
     for index, pair in enumerate(solution):
         if index < len(solution)-1:
             if pair[0] > solution[index+1][0] :
                 return f'Erreur :\nLe point {index} ({pair}) a une abscisse plus grande que le point suivant ({solution[index+1]})\nLes points ne sont donc pas tries par abscisse croissante'
             if pair[0] == solution[index+1][0] and solution[index+1][1] == pair[1] :
                 return f'Erreur :\nLe point {index} et le point {index+1} sont identiques : {pair}'
-        outpout_text += f'Point {index+1} : x = {pair[0]}, h = {pair[1]}\n'
-    return outpout_text
+        outpout_text.append(f'Point {index+1} : x = {pair[0]}, h = {pair[1]}\n')
+    return ''.join(outpout_text)
+
+
+def read_points(solution_stream):
+    for line_number, line in enumerate(solution_stream, 1):
+        if line.isspace():
+            continue
+        values = line.split()
+        if len(values) != 2 or not all(value.isdigit() for value in values):
+            raise ValueError(f'Erreur :\nLa ligne {line_number} de la solution a un format non valide : {line.rstrip()}')
+        yield [int(value) for value in values]
+
+
+class InstanceFormatError(ValueError):
+    pass
+
+
+def read_buildings(instance_stream):
+    next(instance_stream, None)
+    for line_number, line in enumerate(instance_stream, 2):
+        if line.isspace():
+            continue
+        values = line.split()
+        if len(values) != 3 or not all(value.isdigit() for value in values):
+            raise InstanceFormatError(f'Erreur :\nLa ligne {line_number} de l\'exemplaire a un format non valide : {line.rstrip()}')
+        yield [int(value) for value in values]
+
+
+def is_sorted_instance(instance_path):
+    with open(instance_path, 'r') as instance_stream:
+        last_x1 = None
+        for x1, _, _ in read_buildings(instance_stream):
+            if last_x1 is not None and x1 < last_x1:
+                return False
+            last_x1 = x1
+    return True
+
+
+def check_against_instance(solution_path, instance_path):
+    # Both files are streamed : the reference solution is computed by a sweep
+    # over the buildings while the points of the solution are read. The streaming
+    # sweep needs buildings sorted by x1, otherwise the whole instance is loaded
+    # and the reference solution is computed by the sweep line algorithm, which sorts it
+    sorted_instance = is_sorted_instance(instance_path)
+    with open(instance_path, 'r') as instance_stream, open(solution_path, 'r') as solution_stream:
+        if sorted_instance:
+            reference = StreamAlgo().solve(read_buildings(instance_stream))
+        else:
+            reference = ([x, h] for x, h in SweepLineAlgo().solve(list(read_buildings(instance_stream))))
+
+        nb_points = 0
+        for index, (expected, obtained) in enumerate(zip_longest(reference, read_points(solution_stream))):
+            if obtained is None:
+                return False, f'Erreur :\nLa solution s\'arrête au point {index} alors que le point attendu est x = {expected[0]}, h = {expected[1]}'
+            if expected is None:
+                return False, f'Erreur :\nLe point {index} (x = {obtained[0]}, h = {obtained[1]}) est en trop'
+            if expected != obtained:
+                return False, f'Erreur :\nLe point {index} est x = {obtained[0]}, h = {obtained[1]} alors que le point attendu est x = {expected[0]}, h = {expected[1]}'
+            nb_points += 1
+    return True, f'OK : la solution correspond à la solution de référence ({nb_points} points)'
 
 
 if __name__ == '__main__':
@@ -68,9 +129,23 @@ if __name__ == '__main__':
     parser.add_argument("-s", "--solution", \
                         help="Représente la solution à vérifier", \
                         action='store', required=True, metavar='FICHIER_SOLUTION')
+    parser.add_argument("-e", "--exemplaire", \
+                        help="Représente l'exemplaire auquel comparer la solution", \
+                        action='store', required=False, metavar='FICHIER_EXEMPLAIRE')
 
     args = parser.parse_args()
 
+    if args.exemplaire:
+        try:
+            is_valid, message = check_against_instance(args.solution, args.exemplaire)
+        except InstanceFormatError as error:
+            print(error)
+            sys.exit(2)
+        except ValueError as error:
+            is_valid, message = False, str(error)
+        print(message)
+        sys.exit(0 if is_valid else 1)
+
     with open(args.solution, 'r') as fichier :
         solution_content = fichier.read()
 
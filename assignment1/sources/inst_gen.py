@@ -8,15 +8,17 @@
 #
 #   RÉSUMÉ DES CHANGEMENTS :
 #     01/30/2021 - Disponibilité initiale.
+#     10/18/2026 - Ajout de l'option --seed.
 #
 #   USAGE :
 #     Ce script génère les exemplaires requis pour le TP1 portant sur le problème de la ligne d'horizon (Leetcode Hard).
 #
-#     $ ./inst_gen.py [-h] -s NB_BATIMENTS [-n NB_EXEMPLAIRES]
+#     $ ./inst_gen.py [-h] -s NB_BATIMENTS [-n NB_EXEMPLAIRES] [--seed GRAINE]
 #
 #     où :
-#       * NB_BATIMENTS est la taille du problème et 
-#       * NB_EXEMPLAIRES est le nombre d'exemplaires différents requis (par défaut 1).
+#       * NB_BATIMENTS est la taille du problème, 
+#       * NB_EXEMPLAIRES est le nombre d'exemplaires différents requis (par défaut 1) et
+#       * GRAINE rend la génération reproductible, l'exemplaire i utilisant la graine GRAINE + i.
 #
 #     Il est nécessaire de rendre ce script exécutable en utilisant chmod +x
 #     Python 3.5 ou ultérieur recommandé pour lancer ce script.
@@ -25,6 +27,27 @@ import random
 import argparse
 
 
+def generer_exemplaire(chemin, taille, seed=None):
+    rng = random.Random(seed)
+
+    # Parameters
+    max_width = 50
+    max_dist = 30
+    max_height = 300
+
+    with open(chemin,'w') as inst:
+        last_l = 0
+        inst.write("%d\n" % taille)
+        for _ in range(taille):
+            l = rng.randint(last_l, last_l + max_dist)
+            r = rng.randint(l+1, l + max_width)
+            h = rng.randint(1, max_height)
+
+            inst.write("%d %d %d\n" % (l, r, h))
+
+            last_l = l
+
+
 if __name__ == "__main__":
     # Parse arguments
     parser = argparse.ArgumentParser()
@@ -34,27 +57,15 @@ if __name__ == "__main__":
     parser.add_argument("-n", "--nb-exemplaires", \
                         help="Représente le nombre d'exemplaires d'une même taille à générer", \
                         action='store', required=False, metavar='NB_EXEMPLAIRES', type=int)
+    parser.add_argument("--seed", \
+                        help="Représente la graine du premier exemplaire, l'exemplaire i utilisant GRAINE + i", \
+                        action='store', required=False, metavar='GRAINE', type=int)
 
     args = parser.parse_args()
     if not args.nb_exemplaires:
         args.nb_exemplaires = 1
 
-    # Parameters
-    max_width = 50
-    max_dist = 30
-    max_height = 300
-    max_range = args.taille*max_dist
-
     # Generate
     for i in range(args.nb_exemplaires):
-        with open('N' + str(args.taille) + '_' + str(i),'w') as inst:
-            last_l = 0
-            inst.write("%d\n" % args.taille)
-            for _ in range(args.taille):
-                l = random.randint(last_l, last_l + max_dist)
-                r = random.randint(l+1, l + max_width)
-                h = random.randint(1, max_height)
-
-                inst.write("%d %d %d\n" % (l, r, h))
-
-                last_l = l
+        seed = args.seed + i if args.seed is not None else None
+        generer_exemplaire('N' + str(args.taille) + '_' + str(i), args.taille, seed)
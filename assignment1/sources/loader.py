@@ -0,0 +1,87 @@
+import os
+import sys
+import numpy as np
+from typing import Optional
+
+# Binary cache written next to the example file : a header of 6 int64
+#   (magic, rows, columns, itemsize, source size, source mtime) followed by
+#   the raw values, so that it can be memory-mapped on later runs
+CACHE_SUFFIX = '.bin'
+CACHE_MAGIC = 0x31454e494c594b53
+HEADER_SIZE = 6
+
+# This method parses whitespace separated integers in one bulk pass
+#   and returns them as an array of the given number of columns
+def parse_array(data: bytes, columns: int, header: bool = False) -> np.ndarray :
+    values = np.fromstring(data, dtype = np.int64, sep = ' ')
+    if header :
+        if not len(values) or len(values) - 1 != values[0] * columns :
+            raise ValueError('the number of values does not match the header')
+        values = values[1:]
+    if len(values) % columns :
+        raise ValueError(f'the number of values is not a multiple of {columns}')
+    return values.reshape(-1, columns)
+
+def cache_path(path: str) -> str :
+    return path + CACHE_SUFFIX
+
+# This method memory-maps the cache of a file, if it is up to date with
+#   the file size and modification time
+def read_cache(path: str) -> Optional[np.ndarray] :
+    try :
+        stat = os.stat(path)
+        header = np.fromfile(cache_path(path), dtype = '<i8', count = HEADER_SIZE)
+    except (OSError, ValueError) :
+        return None
+    if len(header) != HEADER_SIZE or header[0] != CACHE_MAGIC or \
+       header[4] != stat.st_size or header[5] != stat.st_mtime_ns :
+        return None
+    magic, rows, columns, itemsize, *_ = (int(value) for value in header)
+    if not rows :
+        return np.zeros((0, columns), dtype = f'<i{itemsize}')
+    return np.memmap(cache_path(path), dtype = f'<i{itemsize}', mode = 'r',
+                     offset = 8 * HEADER_SIZE, shape = (rows, columns))
+
+# This method writes the cache of a file atomically, int32 being used
+#   whenever the values fit
+def write_cache(path: str, values: np.ndarray) -> None :
+    stat = os.stat(path)
+    if not len(values) or np.iinfo(np.int32).min <= values.min() and values.max() <= np.iinfo(np.int32).max :
+        values = values.astype('<i4')
+    else :
+        values = values.astype('<i8')
+    header = np.array([CACHE_MAGIC, values.shape[0], values.shape[1], values.itemsize,
+                       stat.st_size, stat.st_mtime_ns], dtype = '<i8')
+    tmp_path = cache_path(path) + '.tmp'
+    try :
+        with open(tmp_path, 'wb') as f :
+            f.write(header.tobytes())
+            f.write(values.tobytes())
+        os.replace(tmp_path, cache_path(path))
+    except OSError :
+        # the cache is only an optimization, e.g. the directory may be read-only
+        if os.path.exists(tmp_path) :
+            os.remove(tmp_path)
+
+def load_array(path: str, columns: int, header: bool = False, cache: bool = True) -> np.ndarray :
+    values = read_cache(path) if cache else None
+    if values is None :
+        with open(path, 'rb') as f :
+            values = parse_array(f.read(), columns, header)
+        if cache :
+            write_cache(path, values)
+    return values
+
+# This method loads the buildings of an example file as an (n,3) array
+def load_buildings(path: str, cache: bool = True) -> np.ndarray :
+    return load_array(path, 3, header = True, cache = cache)
+
+# This method loads the critical points of a solution file as an (n,2) array
+def load_points(path: str, cache: bool = True) -> np.ndarray :
+    return load_array(path, 2, header = False, cache = cache)
+
+if __name__ == "__main__" :
+    # build the cache of the given example files
+    for path in sys.argv[1:] :
+        if not path.endswith(CACHE_SUFFIX) :
+            load_buildings(path)
@@ -0,0 +1,47 @@
+from array import array
+from typing import Iterator, Tuple, TextIO, Optional
+
+# Compact container of critical points, backed by two parallel arrays
+#   of abscissas and heights instead of one small list per point
+class SkylinePoints :
+    __slots__ = ('_xs', '_hs')
+
+    def __init__(self, xs: Optional[array] = None, hs: Optional[array] = None) -> None :
+        self._xs = xs if xs is not None else array('q')
+        self._hs = hs if hs is not None else array('q')
+
+    @property
+    def xs(self) -> array :
+        return self._xs
+
+    @property
+    def hs(self) -> array :
+        return self._hs
+
+    def append(self, x: int, h: int) -> None :
+        self._xs.append(x)
+        self._hs.append(h)
+
+    def pop(self) -> Tuple[int, int] :
+        return self._xs.pop(), self._hs.pop()
+
+    def __len__(self) -> int :
+        return len(self._xs)
+
+    def __getitem__(self, idx: int) -> Tuple[int, int] :
+        return self._xs[idx], self._hs[idx]
+
+    def __iter__(self) -> Iterator[Tuple[int, int]] :
+        return zip(self._xs, self._hs)
+
+    def __eq__(self, other: object) -> bool :
+        if not isinstance(other, SkylinePoints) :
+            return NotImplemented
+        return self._xs == other._xs and self._hs == other._hs
+
+    def __repr__(self) -> str :
+        return f'SkylinePoints({list(self)})'
+
+    # This method writes the critical points, one per line
+    def write(self, stream: TextIO) -> None :
+        stream.writelines(f'{x} {h}\n' for x, h in zip(self._xs, self._hs))
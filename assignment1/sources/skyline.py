@@ -1,7 +1,24 @@
+import os
+import sys
 import time
 import argparse
-from algos import IAlgo, NaiveAlgo, DCAlgo, DCThresAlgo
-from typing import List, Dict
+import calibration
+import loader
+from algos import IAlgo, NaiveAlgo, DCAlgo, DCThresAlgo, SweepLineAlgo, NumpyAlgo, ParallelDCAlgo, StreamAlgo
+from points import SkylinePoints
+from typing import List, Dict, Iterator
+
+ALGOS = ['brute', 'recursif', 'seuil', 'sweep', 'numpy', 'parallel', 'stream']
+
+# This method creates the algorithm of the given name
+def create_algo(name: str, threshold: int, iterative: bool = False, jobs: int = 1) -> IAlgo :
+    return {'brute':    NaiveAlgo,
+            'recursif': lambda : DCAlgo(iterative),
+            'seuil':    lambda : DCThresAlgo(threshold, iterative),
+            'sweep':    SweepLineAlgo,
+            'numpy':    NumpyAlgo,
+            'parallel': lambda : ParallelDCAlgo(threshold, jobs),
+            'stream':   StreamAlgo}[name]()
 
 class Skyline:
     def __init__(self, algo: IAlgo) -> None:
@@ -18,11 +35,17 @@ class Skyline:
     def execute_algo(self, buildings: List[List[int]], options: Dict[str, bool]) -> None :
         start_time = time.perf_counter()
         solution = self._algo.solve(buildings)
+        # a streamed solution is only computed while it is consumed,
+        #   so it is printed on the fly
+        if isinstance(solution, Iterator) :
+            for critical in solution :
+                if options['print'] :
+                    print(*critical)
+            solution = SkylinePoints()
         end_time = time.perf_counter()
 
         if options['print'] :
-            for critical in solution :
-                print(*critical)
+            solution.write(sys.stdout)
 
         if options['time'] :
             elapsed_time_ms = (end_time - start_time) * 1000
@@ -34,11 +57,11 @@ if __name__ == "__main__" :
     parser.add_argument("-a", \
                         help="algorithm to use", \
                         dest="algo", \
-                        action='store', required=True)
+                        action='store', choices=ALGOS)
     parser.add_argument("-e", \
-                        help="example file with buildings", \
+                        help="example file with buildings (- for stdin, the default with -a stream)", \
                         dest="example_file", \
-                        action='store', required=True, metavar = 'FILE_EXAMPLE')
+                        action='store', metavar = 'FILE_EXAMPLE')
     parser.add_argument("-t", \
                         help="prints elapsed time", \
                         dest="time", \
@@ -47,21 +70,64 @@ if __name__ == "__main__" :
                         help="print solution", \
                         dest="print", \
                         action='store_true')
+    parser.add_argument("-i", \
+                        help="iterative divide and conquer", \
+                        dest="iterative", \
+                        action='store_true')
+    parser.add_argument("-j", \
+                        help="number of processes for parallel algorithm", \
+                        dest="jobs", \
+                        action='store', type=int, default=os.cpu_count())
+    parser.add_argument("--calibrate", \
+                        help="calibrate the threshold on examples of the data directory", \
+                        dest="calibrate", \
+                        action='store_true')
+    parser.add_argument("--data", \
+                        help="data directory used for calibration", \
+                        dest="data_dir", \
+                        action='store', default=calibration.DATA_DIR, metavar = 'DATA_DIR')
     args = parser.parse_args()
 
-    with open(args.example_file, 'r') as f :
-        next(f)
-        buildings = list()
-        for line in f :
-            buildings.append([int(x) for x in line.rstrip().split()])
+    if args.calibrate :
+        best_thresholds = calibration.calibrate(args.data_dir)
+        calibration.save_thresholds(best_thresholds)
+        for size, threshold in best_thresholds.items() :
+            print(size, threshold)
+        parser.exit()
+    if not args.algo :
+        parser.error("the following arguments are required: -a")
+    # only the streaming algorithm reads stdin when -e is missing
+    if not args.example_file and args.algo != 'stream' :
+        parser.error("the following arguments are required: -e (- for stdin)")
 
     options = {'print': args.print, 'time': args.time}
+    from_stdin = not args.example_file or args.example_file == '-'
+    if args.algo == 'stream' :
+        # buildings are read lazily while the skyline is streamed,
+        #   so the file is only closed once the skyline is printed
+        f = sys.stdin if from_stdin else open(args.example_file, 'r')
+        try :
+            next(f)
+            buildings = ([int(x) for x in line.split()] for line in f if not line.isspace())
+            skyline = Skyline(create_algo(args.algo, calibration.DEFAULT_THRESHOLD))
+            skyline.execute_algo(buildings, options)
+        finally :
+            if f is not sys.stdin :
+                f.close()
+    else :
+        if from_stdin :
+            buildings = loader.parse_array(sys.stdin.buffer.read(), 3, header = True)
+        else :
+            buildings = loader.load_buildings(args.example_file)
+        # only the vectorized algorithm works on the array itself
+        if args.algo != 'numpy' :
+            buildings = buildings.tolist()
+
+        # threshold calibrated for the size of the example, if any
+        threshold = calibration.load_threshold(len(buildings))
 
-    threshold = 20
-    algo = {'brute':    NaiveAlgo(),
-            'recursif': DCAlgo(),
-            'seuil':    DCThresAlgo(threshold)}[args.algo]
+        algo = create_algo(args.algo, threshold, args.iterative, args.jobs)
 
-    # solve skyline problem
-    skyline = Skyline(algo)
-    skyline.execute_algo(buildings, options)
\ No newline at end of file
+        # solve skyline problem
+        skyline = Skyline(algo)
+        skyline.execute_algo(buildings, options)
\ No newline at end of file
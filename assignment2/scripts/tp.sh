@@ -2,14 +2,20 @@
 ALGO=""
 EXAMPLE_FILE=""
 OPTIONS=""
+JOBS=""
+RESTARTS=""
 
-while getopts "a:e:ptx" FLAG; # x is optional to compute maximum height
+while getopts "a:e:j:r:ptx" FLAG; # x is optional to compute maximum height
 do
   case "${FLAG}" in
     a)
       ALGO="${OPTARG}";;
     e) 
       EXAMPLE_FILE="${OPTARG}";;
+    j)
+      JOBS="-j ${OPTARG}";;
+    r)
+      RESTARTS="--restarts ${OPTARG}";;
     p | t | x)
       OPTIONS+="${FLAG}";;
     ?)
@@ -22,4 +28,4 @@ if [ ! -z "${OPTIONS}" ]; then
   OPTIONS="-${OPTIONS}"
 fi
 
-python3 ../sources/box_stacking.py -a $ALGO -e $EXAMPLE_FILE $OPTIONS
+python3 ../sources/box_stacking.py -a $ALGO -e $EXAMPLE_FILE $OPTIONS $JOBS $RESTARTS
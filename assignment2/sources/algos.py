@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List
-from collections import deque
+from typing import List, Callable, Optional
+from collections import deque, Counter
+from concurrent.futures import ProcessPoolExecutor
 import utils
-import random
+import time
 import copy
+import random
+import numpy as np
 
 # Interface for algorithm
 class IAlgo(ABC) :
@@ -13,9 +16,27 @@ class IAlgo(ABC) :
 
 # Greedy algorithm
 class GreedyAlgo(IAlgo):
+    # The greedy key of each block can be perturbed by a random factor
+    #   in [1, 1 + noise) to get different starting solutions
+    def __init__(self, noise: float = 0.0, seed: int = 0) -> None:
+        self._noise = noise
+        self._seed = seed
+
+    @property
+    def noise(self) -> float :
+        return self._noise
+
+    @noise.setter
+    def noise(self, noise: float) -> None :
+        self._noise = noise
+
     def solve(self, blocks: List[List[int]]) -> List[List[int]] :
         # Greedy choice : width * depth + height
-        blocks.sort(key = lambda x : x[0] + x[1] * x[2], reverse = True)
+        if self._noise :
+            rng = random.Random(self._seed)
+            blocks.sort(key = lambda x : (x[0] + x[1] * x[2]) * (1 + self._noise * rng.random()), reverse = True)
+        else :
+            blocks.sort(key = lambda x : x[0] + x[1] * x[2], reverse = True)
         greedy_blocks = [blocks[0]]
         last_idx = 0
         idx = 1
@@ -61,11 +82,120 @@ class DynProgAlgo(IAlgo):
 
         return [blocks[idx] for idx in track]
 
+# Dynamic programming algorithm with a vectorized inner loop
+# The blocks can be given as an (n,3) array, which is used without conversion
+class VecDynProgAlgo(IAlgo):
+    def solve(self, blocks: List[List[int]]) -> List[List[int]] :
+        # Sort blocks by decreasing area (width * height), blocks of the same
+        #   area keeping their order as with a stable sort
+        blocks = np.asarray(blocks, dtype = np.int64).reshape(-1, 3)
+        blocks = blocks[np.argsort(-(blocks[:, 1] * blocks[:, 2]), kind = 'stable')]
+        heights, widths, depths = (np.ascontiguousarray(column) for column in blocks.T)
+
+        # Same table as the dynamic programming algorithm, each row being computed
+        #   at once : the first maximum of the table over the blocks below which
+        #   the block can be stacked is the dependency
+        n = len(blocks)
+        dependency = [-1]*n
+        table = np.zeros(n, dtype = np.int64)
+        # Buffers reused by every row to avoid allocations
+        mask = np.empty(n, dtype = bool)
+        deeper = np.empty(n, dtype = bool)
+        candidates = np.empty(n, dtype = np.int64)
+        for j in range(n):
+            running_max = 0
+            if j:
+                np.greater(widths[:j], widths[j], out = mask[:j])
+                np.greater(depths[:j], depths[j], out = deeper[:j])
+                np.logical_and(mask[:j], deeper[:j], out = mask[:j])
+                np.multiply(table[:j], mask[:j], out = candidates[:j])
+                i = int(candidates[:j].argmax())
+                if candidates[i] > 0:
+                    running_max = candidates[i]
+                    dependency[j] = i
+            table[j] = running_max + heights[j]
+
+        # Reconstruct the optimal solution from computed information 
+        #   in dependency and track of indices
+        track = deque([int(table.argmax())])
+        while dependency[track[0]] != -1:
+            track.appendleft(dependency[track[0]])
+
+        return blocks[list(track)].tolist()
+
+# Dynamic programming algorithm with a Fenwick tree
+class FastDynProgAlgo(IAlgo):
+    def solve(self, blocks: List[List[int]]) -> List[List[int]] :
+        n = len(blocks)
+        heights, widths, depths = zip(*blocks)
+
+        # Blocks are processed by decreasing width, so that every block which can
+        #   be below the current block has already been processed. Depths are ranked
+        #   decreasingly (from 1) so that deeper blocks form a prefix of the Fenwick tree
+        order = sorted(range(n), key = widths.__getitem__, reverse = True)
+        ranks = {depth: rank for rank, depth in enumerate(sorted(set(depths), reverse = True), 1)}
+        size = len(ranks)
+
+        # Fenwick tree of prefix maxima of table values (and their indices) over depth ranks
+        tree_values = [0]*(size + 1)
+        tree_idxs = [-1]*(size + 1)
+        dependency = [-1]*n
+        table = [0]*n
+
+        start = 0
+        while start < n:
+            # Blocks of equal width cannot be stacked on each other, so all of them
+            #   are queried before any of them is inserted
+            end = start
+            while end < n and widths[order[end]] == widths[order[start]]:
+                end += 1
+
+            for j in order[start:end]:
+                # Maximum over blocks strictly deeper (and strictly wider)
+                rank = ranks[depths[j]] - 1
+                running_max = 0
+                while rank > 0:
+                    if tree_values[rank] > running_max:
+                        running_max = tree_values[rank]
+                        dependency[j] = tree_idxs[rank]
+                    rank -= rank & -rank
+                table[j] = running_max + heights[j]
+
+            for j in order[start:end]:
+                rank = ranks[depths[j]]
+                while rank <= size:
+                    if table[j] > tree_values[rank]:
+                        tree_values[rank] = table[j]
+                        tree_idxs[rank] = j
+                    rank += rank & -rank
+            start = end
+
+        # Reconstruct the optimal solution from computed information 
+        #   in dependency and track of indices
+        track = deque([max(range(n), key = table.__getitem__)])
+        while dependency[track[0]] != -1:
+            track.appendleft(dependency[track[0]])
+
+        return [blocks[idx] for idx in track]
+
 
 # Tabu search algorithm
+# Without a deadline, the search stops after max_iter iterations without
+#   improvement, with a deadline (as given by time.time()), it goes on until
+#   the deadline and returns the best solution found so far
+# The callback is called with each new best height and the elapsed time
+# The initial solution is computed by the init algorithm if given, else by
+#   the greedy algorithm
 class TabuAlgo(IAlgo):
-    def __init__(self, max_iter: int) -> None: 
+    def __init__(self, max_iter: int, seed: int = 0, noise: float = 0.0,
+                 deadline: Optional[float] = None, callback: Optional[Callable[[int, float], None]] = None,
+                 init: Optional[IAlgo] = None) -> None: 
         self._max_iter = max_iter
+        self._seed = seed
+        self._noise = noise
+        self._deadline = deadline
+        self._callback = callback
+        self._init = init
     
     @property
     def max_iter(self) -> int :
@@ -75,23 +205,84 @@ class TabuAlgo(IAlgo):
     def max_iter(self, max_iter: int) -> None :
         self._max_iter = max_iter
 
+    @property
+    def seed(self) -> int :
+        return self._seed
+
+    @seed.setter
+    def seed(self, seed: int) -> None :
+        self._seed = seed
+
+    @property
+    def noise(self) -> float :
+        return self._noise
+
+    @noise.setter
+    def noise(self, noise: float) -> None :
+        self._noise = noise
+
+    @property
+    def deadline(self) -> Optional[float] :
+        return self._deadline
+
+    @deadline.setter
+    def deadline(self, deadline: Optional[float]) -> None :
+        self._deadline = deadline
+
+    @property
+    def callback(self) -> Optional[Callable[[int, float], None]] :
+        return self._callback
+
+    @callback.setter
+    def callback(self, callback: Optional[Callable[[int, float], None]]) -> None :
+        self._callback = callback
+
+    @property
+    def init(self) -> Optional[IAlgo] :
+        return self._init
+
+    @init.setter
+    def init(self, init: Optional[IAlgo]) -> None :
+        self._init = init
+
+    # This method computes the initial solution, the greedy one being
+    #   perturbed by the noise
+    def initial(self, blocks: List[List[int]]) -> List[List[int]] :
+        if self._init is None :
+            return GreedyAlgo(self._noise, self._seed).solve(blocks)
+        return self._init.solve(blocks)
+
+    # This method tells if the search goes on, given the number of
+    #   remaining iterations without improvement
+    def searching(self, count: int) -> bool :
+        if self._deadline is not None :
+            return time.time() < self._deadline
+        return count > 0
+
+    # This method reports a new best height to the callback, if any
+    def report(self, height: int, start_time: float) -> None :
+        if self._callback is not None :
+            self._callback(height, time.perf_counter() - start_time)
 
     def solve(self, blocks: List[List[int]]) -> List[List[int]] :
-        # Compute the initial solution with greedy algorithm
-        greedy_blocks = GreedyAlgo().solve(blocks)
-        best_candidate = utils.Candidate(greedy_blocks, utils.compute_height(greedy_blocks))
-        candidate = copy.deepcopy(best_candidate)
+        start_time = time.perf_counter()
+
+        # Compute the initial solution
+        initial_blocks = self.initial(blocks)
+        candidate = utils.Candidate(initial_blocks, utils.compute_height(initial_blocks))
+        best_candidate_height = candidate.height
+        self.report(best_candidate_height, start_time)
         
         # Different tabu lists with sizes 7 to 10
         # A tabu list is defined with a deque with a fixed size
         #   when the deque is full, the older block is popped and 
         #   is no longer tabu
         tabus = tuple(deque(maxlen = size) for size in range(7, 10+1))
-        random.seed(0)
+        rng = random.Random(self._seed)
 
         count = self._max_iter
 
-        while count :
+        while self.searching(count) :
             count -= 1
             neighbours = {*blocks} - {*candidate.blocks} - \
                          {block for tabu in tabus for blocks in tabu for block in blocks}
@@ -106,11 +297,14 @@ class TabuAlgo(IAlgo):
                     best_neighbour = neighbour
             
             # If the set of neighbours is empty, pop older tabu blocks
-            #   and continue the loop
+            #   and continue the loop, or stop when no block is tabu
             if not neighbours:
+                if not any(tabus) :
+                    break
                 for tabu in tabus :
-                    tabu.popleft()
-                pass
+                    if tabu :
+                        tabu.popleft()
+                continue
 
             # The best neighbour becomes the candidate solution
             candidate.push(best_neighbour, update = True)
@@ -118,11 +312,123 @@ class TabuAlgo(IAlgo):
             # If the candidate solution is better than the current best solution,
             #   the candidate becomes the current best solution and
             #   the counter is resetted
-            if candidate.height > best_candidate.height :
-                best_candidate = copy.deepcopy(candidate)
+            if candidate.height > best_candidate_height :
+                best_candidate_height = candidate.height
+                candidate.snapshot()
                 count = self._max_iter
+                self.report(best_candidate_height, start_time)
         
             # update tabu list with blocks removed in candidate
-            random.choice(tabus).append(candidate.tabu)
+            rng.choice(tabus).append(candidate.tabu)
         
-        return best_candidate.blocks
\ No newline at end of file
+        # Go back to the best solution
+        candidate.restore()
+        return candidate.blocks
+
+
+# Tabu search algorithm with incremental evaluation of neighbours : after a move,
+#   only the neighbours whose insertion overlaps the modified part of the stack
+#   are evaluated again, and the best one is kept on top of a heap
+class IncrementalTabuAlgo(TabuAlgo):
+    def solve(self, blocks: List[List[int]]) -> List[List[int]] :
+        start_time = time.perf_counter()
+
+        # Compute the initial solution
+        initial_blocks = self.initial(blocks)
+        candidate = utils.Candidate(initial_blocks, utils.compute_height(initial_blocks))
+        best_candidate_height = candidate.height
+        self.report(best_candidate_height, start_time)
+
+        # Different tabu lists with sizes 7 to 10, and the number of
+        #   tabu lists in which each block is
+        tabus = tuple(deque(maxlen = size) for size in range(7, 10+1))
+        tabu_counts = Counter()
+        rng = random.Random(self._seed)
+
+        stacked = {*candidate.blocks}
+        neighbourhood = utils.Neighbourhood(candidate, {*blocks})
+        for block in {*blocks} - stacked :
+            neighbourhood.add(block)
+
+        # Blocks leaving tabu lists become neighbours again
+        def release(released: List[List[int]]) -> None :
+            tabu_counts.subtract(released)
+            for block in released :
+                if not tabu_counts[block] and block not in stacked and block not in neighbourhood :
+                    neighbourhood.add(block)
+
+        count = self._max_iter
+
+        while self.searching(count) :
+            count -= 1
+            best_neighbour = neighbourhood.best()
+
+            # If the set of neighbours is empty, pop older tabu blocks
+            #   and continue the loop
+            if best_neighbour is None :
+                released = [block for tabu in tabus if tabu for block in tabu.popleft()]
+                if not released :
+                    break
+                release(released)
+                continue
+
+            # The best neighbour becomes the candidate solution
+            neighbourhood.move(best_neighbour)
+            stacked.add(best_neighbour)
+            stacked.difference_update(candidate.tabu)
+
+            # If the candidate solution is better than the current best solution,
+            #   the candidate becomes the current best solution and
+            #   the counter is resetted
+            if candidate.height > best_candidate_height :
+                best_candidate_height = candidate.height
+                candidate.snapshot()
+                count = self._max_iter
+                self.report(best_candidate_height, start_time)
+
+            # update tabu list with blocks removed in candidate
+            tabu = rng.choice(tabus)
+            released = tabu[0] if len(tabu) == tabu.maxlen else []
+            tabu.append(candidate.tabu)
+            tabu_counts.update(candidate.tabu)
+            release(released)
+        
+        # Go back to the best solution
+        candidate.restore()
+        return candidate.blocks
+
+
+def solve_start(algo: IAlgo, blocks: List[List[int]]) -> List[List[int]] :
+    return algo.solve(blocks)
+
+# Multi-start tabu search algorithm : copies of a tabu search with different
+#   seeds and perturbed greedy starting solutions are run in worker processes,
+#   and the highest stack is kept
+# The first start is the given tabu search with seed 0
+class MultiStartTabuAlgo(IAlgo):
+    def __init__(self, tabu_algo: TabuAlgo, restarts: int, jobs: int, noise: float = 0.2) -> None:
+        self._algos = []
+        for seed in range(restarts) :
+            algo = copy.copy(tabu_algo)
+            algo.seed = seed
+            if seed :
+                algo.noise = noise
+            self._algos.append(algo)
+        self._jobs = jobs
+
+    @property
+    def jobs(self) -> int :
+        return self._jobs
+
+    @jobs.setter
+    def jobs(self, jobs: int) -> None :
+        self._jobs = jobs
+
+    def solve(self, blocks: List[List[int]]) -> List[List[int]] :
+        jobs = max(1, min(self._jobs, len(self._algos)))
+        if jobs == 1 :
+            solutions = [algo.solve(list(blocks)) for algo in self._algos]
+        else :
+            with ProcessPoolExecutor(max_workers = jobs) as executor :
+                solutions = list(executor.map(solve_start, self._algos, [blocks] * len(self._algos)))
+        return max(solutions, key = utils.compute_height)
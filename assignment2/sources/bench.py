@@ -0,0 +1,223 @@
+import os
+import re
+import csv
+import sys
+import math
+import json
+import time
+import argparse
+import datetime
+import subprocess
+import tracemalloc
+import numpy as np
+import utils
+import loader
+from algos import IAlgo, FastDynProgAlgo
+from box_stacking import ALGOS, create_algo, prepare_blocks
+from typing import List, Dict, Optional
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.bench_history.json')
+FIELDS = ['algo', 'size', 'instances', 'runs', 'median_ms', 'p95_ms', 'mean_median_ms', 'peak_kib',
+          'mean_height', 'mean_gap']
+# The quadratic dynamic programming algorithm is only benchmarked when asked
+#   for, and the tabu searches, whose height can regress, are never run on more
+#   boxes than their maximum size (seconds to minutes per run above)
+DEFAULT_ALGOS = [algo for algo in ALGOS if algo != 'progdyn']
+MAX_SIZES = {'tabou': 1000, 'tabou-incr': 1000}
+
+# This method groups the example files b<size>_<k>.txt of a directory by size
+def find_examples(data_dir: str, samples: int) -> Dict[int, List[str]] :
+    examples = dict()
+    for name in os.listdir(data_dir) :
+        match = re.fullmatch(r'b(\d+)_(\d+)\.txt', name)
+        if match :
+            examples.setdefault(int(match.group(1)), []).append((int(match.group(2)), os.path.join(data_dir, name)))
+    return {size: [path for _, path in sorted(files)][:samples] for size, files in sorted(examples.items())}
+
+# Same helpers as in the benchmark of assignment1, each assignment being self-contained
+def median(values: List[float]) -> float :
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+# Nearest-rank percentile
+def percentile(values: List[float], rank: float) -> float :
+    values = sorted(values)
+    return values[max(0, math.ceil(rank * len(values)) - 1)]
+
+# The algorithms working on lists sort the blocks in place, so each run gets
+#   its own copy, arrays being left untouched
+def fresh(blocks: list) -> list :
+    return blocks if isinstance(blocks, np.ndarray) else list(blocks)
+
+# This method times an algorithm on the examples of one size, measures its peak
+#   memory in a separate traced run, and compares the heights of its solutions
+#   to the optimal heights
+# The times of examples of the same size can differ a lot, so the median of
+#   each example is also averaged over the examples, which is much more stable
+#   from one benchmark to the next than the median of all the runs
+def bench(algo: IAlgo, examples: List[list], optima: List[int], warmup: int, repeat: int) -> Dict[str, float] :
+    timings = []
+    medians = []
+    heights = []
+    gaps = []
+    peak = 0
+    for blocks, optimum in zip(examples, optima) :
+        for _ in range(warmup) :
+            algo.solve(fresh(blocks))
+        example_timings = []
+        for _ in range(repeat) :
+            blocks_copy = fresh(blocks)
+            start_time = time.perf_counter()
+            algo.solve(blocks_copy)
+            example_timings.append((time.perf_counter() - start_time) * 1000)
+        timings.extend(example_timings)
+        medians.append(median(example_timings))
+
+        tracemalloc.start()
+        solution = algo.solve(fresh(blocks))
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        height = utils.compute_height(solution)
+        heights.append(height)
+        gaps.append((optimum - height) / optimum)
+    return {'instances': len(examples), 'runs': len(timings), 'median_ms': median(timings),
+            'p95_ms': percentile(timings, 0.95), 'mean_median_ms': sum(medians) / len(medians), 'peak_kib': peak / 1024,
+            'mean_height': sum(heights) / len(heights), 'mean_gap': sum(gaps) / len(gaps)}
+
+# This method returns the current git commit, if any
+def git_version() -> Optional[str] :
+    try :
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output = True, text = True,
+                              cwd = os.path.dirname(os.path.abspath(__file__)), check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError) :
+        return None
+
+def load_history(history_file: str) -> List[dict] :
+    try :
+        with open(history_file, 'r') as f :
+            return json.load(f)
+    except (OSError, ValueError) :
+        return []
+
+def save_history(history: List[dict], history_file: str) -> None :
+    with open(history_file, 'w') as f :
+        json.dump(history, f, indent = 2)
+
+# This method compares results to the last recorded results of the same
+#   algorithm on the same examples, and returns a message per regression :
+#   a mean median time slower by more than the tolerance and by more than
+#   min_delta milliseconds, so that the noise of short runs is not flagged,
+#   or a lower mean height
+def find_regressions(results: List[dict], history: List[dict], tolerance: float, min_delta: float) -> List[str] :
+    previous = dict()
+    for entry in history :
+        for result in entry['results'] :
+            previous[result['algo'], result['size'], result['instances']] = (entry.get('version'), result)
+
+    regressions = []
+    for result in results :
+        key = result['algo'], result['size'], result['instances']
+        if key not in previous :
+            continue
+        version, old = previous[key]
+        # results recorded before the mean median time are compared on their height only
+        if 'mean_median_ms' in old and result['mean_median_ms'] > old['mean_median_ms'] * (1 + tolerance) and \
+                result['mean_median_ms'] - old['mean_median_ms'] > min_delta :
+            regressions.append(f"{result['algo']} on size {result['size']} : mean median time "
+                               f"{old['mean_median_ms']:.1f} ms ({version}) -> {result['mean_median_ms']:.1f} ms")
+        if result['mean_height'] < old['mean_height'] :
+            regressions.append(f"{result['algo']} on size {result['size']} : mean height "
+                               f"{old['mean_height']:.1f} ({version}) -> {result['mean_height']:.1f}")
+    return regressions
+
+if __name__ == "__main__" :
+    # parse arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-a", \
+                        help="algorithms to benchmark (all but progdyn by default)", \
+                        dest="algos", \
+                        action='store', nargs='+', choices=ALGOS, default=DEFAULT_ALGOS)
+    parser.add_argument("--data", \
+                        help="data directory with the examples b<size>_<k>.txt", \
+                        dest="data_dir", \
+                        action='store', default=DATA_DIR, metavar = 'DATA_DIR')
+    parser.add_argument("--max-size", \
+                        help="largest size to benchmark (at most 1000 for the tabu searches)", \
+                        dest="max_size", \
+                        action='store', type=int, default=10000)
+    parser.add_argument("--samples", \
+                        help="number of examples per size", \
+                        dest="samples", \
+                        action='store', type=int, default=10)
+    parser.add_argument("--warmup", \
+                        help="number of warmup runs per example", \
+                        dest="warmup", \
+                        action='store', type=int, default=1)
+    parser.add_argument("--repeat", \
+                        help="number of timed runs per example", \
+                        dest="repeat", \
+                        action='store', type=int, default=5)
+    parser.add_argument("--history", \
+                        help="JSON file of the results of previous versions", \
+                        dest="history_file", \
+                        action='store', default=HISTORY_FILE, metavar = 'FILE_JSON')
+    parser.add_argument("--tolerance", \
+                        help="relative slowdown of the mean median time flagged as a regression", \
+                        dest="tolerance", \
+                        action='store', type=float, default=0.25)
+    parser.add_argument("--min-delta", \
+                        help="smallest slowdown of the mean median time in ms flagged as a regression", \
+                        dest="min_delta", \
+                        action='store', type=float, default=10.0)
+    parser.add_argument("--no-save", \
+                        help="does not record the results in the history", \
+                        dest="save", \
+                        action='store_false')
+    parser.add_argument("--accept", \
+                        help="records the results even if a regression is found, as the new reference", \
+                        dest="accept", \
+                        action='store_true')
+    args = parser.parse_args()
+
+    # examples are loaded once as arrays, with their optimal heights given
+    #   by the exact O(n log n) dynamic programming algorithm
+    examples = dict()
+    for size, files in find_examples(args.data_dir, args.samples).items() :
+        if size <= args.max_size :
+            blocks = [loader.load_blocks(example_file) for example_file in files]
+            optima = [utils.compute_height(FastDynProgAlgo().solve(example.tolist())) for example in blocks]
+            examples[size] = (blocks, optima)
+
+    writer = csv.DictWriter(sys.stdout, fieldnames = FIELDS)
+    writer.writeheader()
+    results = []
+    for name in args.algos :
+        for size, (blocks, optima) in examples.items() :
+            if size > MAX_SIZES.get(name, size) :
+                continue
+            algo = create_algo(name)
+            result = {'algo': name, 'size': size}
+            result.update(bench(algo, [prepare_blocks(algo, example) for example in blocks], optima,
+                                args.warmup, args.repeat))
+            writer.writerow(result)
+            sys.stdout.flush()
+            results.append(result)
+
+    history = load_history(args.history_file)
+    regressions = find_regressions(results, history, args.tolerance, args.min_delta)
+    for regression in regressions :
+        print(f'# regression : {regression}', file = sys.stderr)
+
+    # results with a regression are not recorded unless accepted, so that
+    #   they do not become the reference of the next benchmark
+    if regressions and not args.accept :
+        print('# results not recorded, --accept records them as the new reference', file = sys.stderr)
+    elif args.save :
+        history.append({'version': git_version(), 'date': datetime.datetime.now().isoformat(timespec = 'seconds'),
+                        'results': results})
+        save_history(history, args.history_file)
+
+    sys.exit(1 if regressions else 0)
@@ -1,9 +1,41 @@
+import os
+import sys
 import time
 import argparse
-from algos import IAlgo, GreedyAlgo, DynProgAlgo, TabuAlgo
+import numpy as np
+import loader
+from algos import IAlgo, GreedyAlgo, DynProgAlgo, VecDynProgAlgo, FastDynProgAlgo, TabuAlgo, IncrementalTabuAlgo, MultiStartTabuAlgo
 from typing import List, Dict
 import utils
 
+ALGOS = ['glouton', 'progdyn', 'progdyn-numpy', 'progdyn-fast', 'tabou', 'tabou-incr']
+
+# This method creates the algorithm of the given name
+def create_algo(name: str) -> IAlgo :
+    return {'glouton':       GreedyAlgo,
+            'progdyn':       DynProgAlgo,
+            'progdyn-numpy': VecDynProgAlgo,
+            'progdyn-fast':  FastDynProgAlgo,
+            'tabou':         lambda : TabuAlgo(100),
+            'tabou-incr':    lambda : IncrementalTabuAlgo(100)}[name]()
+
+# This method converts the array of blocks to what the algorithm works on :
+#   the vectorized dynamic programming algorithm works on the array itself,
+#   tabu search on tuples, which are hashable, and the other algorithms on lists
+def prepare_blocks(algo: IAlgo, blocks: np.ndarray) -> list :
+    if isinstance(algo, VecDynProgAlgo) :
+        return blocks
+    if isinstance(algo, (TabuAlgo, MultiStartTabuAlgo)) :
+        return loader.as_tuples(blocks)
+    return blocks.tolist()
+
+# Algorithms which can compute the initial solution of tabu search
+INIT_ALGOS = ['glouton', 'progdyn-fast']
+
+# This method reports a new best height of tabu search
+def report_height(height: int, elapsed_time: float) -> None :
+    print(f'{height} {elapsed_time:.3f}', file = sys.stderr, flush = True)
+
 class BoxStacking:
     def __init__(self, algo: IAlgo) -> None:
         self._algo = algo
@@ -37,7 +69,7 @@ if __name__ == "__main__" :
     parser.add_argument("-a", \
                         help="algorithm to use", \
                         dest="algo", \
-                        action='store', required=True)
+                        action='store', required=True, choices=ALGOS)
     parser.add_argument("-e", \
                         help="example file with blocks", \
                         dest="example_file", \
@@ -54,20 +86,45 @@ if __name__ == "__main__" :
                         help="prints maximum height", \
                         dest="height", \
                         action='store_true')
+    parser.add_argument("-j", \
+                        help="number of processes for multi-start tabu search", \
+                        dest="jobs", \
+                        action='store', type=int, default=os.cpu_count())
+    parser.add_argument("--restarts", \
+                        help="number of independent starts of tabu search", \
+                        dest="restarts", \
+                        action='store', type=int, default=1)
+    parser.add_argument("--init", \
+                        help="algorithm computing the initial solution of tabu search", \
+                        dest="init", \
+                        action='store', choices=INIT_ALGOS, default='glouton')
+    parser.add_argument("--time-limit", \
+                        help="runs tabu search for this time and reports each new best height" \
+                             " and its elapsed time on stderr", \
+                        dest="time_limit", \
+                        action='store', type=float, metavar = 'SECONDS')
     args = parser.parse_args()
 
-    # read blocks in file
-    blocks = []
-    with open(args.example_file, 'r') as f :
-        for line in f :
-            blocks.append(tuple(int(x) for x in line.rstrip().split()))
+    # read blocks in file, through its binary cache
+    blocks = loader.load_blocks(args.example_file)
 
     options = {'print': args.print, 'time': args.time, 'height': args.height}
 
-    algo = {'glouton': GreedyAlgo(),
-            'progdyn': DynProgAlgo(),
-            'tabou'  : TabuAlgo(100)}[args.algo]
+    algo = create_algo(args.algo)
+
+    if isinstance(algo, TabuAlgo) :
+        if args.init == 'progdyn-fast' :
+            algo.init = FastDynProgAlgo()
+
+        # stop tabu search at the deadline instead of after 100 iterations without improvement
+        if args.time_limit is not None :
+            algo.deadline = time.time() + args.time_limit
+            algo.callback = report_height
+
+        # run several starts of tabu search in parallel
+        if args.restarts > 1 :
+            algo = MultiStartTabuAlgo(algo, args.restarts, args.jobs)
 
     # solve box stacking problem
     box_stacking = BoxStacking(algo)
-    box_stacking.execute_algo(blocks, options)
\ No newline at end of file
+    box_stacking.execute_algo(prepare_blocks(algo, blocks), options)
\ No newline at end of file
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+# INF8775 - Analyse et conception d'algorithmes
+#   TP2 - Box Stacking Problem
+#
+#   USAGE :
+#     Ce script génère les exemplaires du TP2 comme scripts/gen.sh : les
+#     dimensions des boîtes sont une permutation de 1 à 3n, regroupées par 3,
+#     et chaque boîte donne trois blocs, un par orientation.
+#
+#     $ ./inst_gen.py [-h] -s NB_BOITES [-n NB_EXEMPLAIRES] [--seed GRAINE]
+#
+#     où :
+#       * NB_BOITES est le nombre de boîtes (l'exemplaire a 3 * NB_BOITES blocs),
+#       * NB_EXEMPLAIRES est le nombre d'exemplaires différents requis (par défaut 1) et
+#       * GRAINE rend la génération reproductible, l'exemplaire i utilisant la graine GRAINE + i.
+#
+#     Les exemplaires sont numérotés à partir de 1, comme ceux de gen.sh.
+
+import random
+import argparse
+
+
+def generer_exemplaire(chemin, taille, seed=None):
+    rng = random.Random(seed)
+
+    # Génération d'une permutation de 1 à 3n
+    dimensions = list(range(1, 3*taille + 1))
+    rng.shuffle(dimensions)
+
+    with open(chemin,'w') as inst:
+        # Regroupement par bloc de 3, on génère trois orientations différentes
+        #   (hauteur, puis la plus petite et la plus grande des deux autres dimensions)
+        for i in range(0, 3*taille, 3):
+            a, b, c = dimensions[i:i+3]
+            inst.write("%d %d %d\n" % (a, min(b, c), max(b, c)))
+            inst.write("%d %d %d\n" % (b, min(a, c), max(a, c)))
+            inst.write("%d %d %d\n" % (c, min(a, b), max(a, b)))
+
+
+if __name__ == "__main__":
+    # Parse arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-s", "--taille", \
+                        help="Représente le nombre de boîtes à générer", \
+                        action='store', required=True, metavar='NB_BOITES', type=int)
+    parser.add_argument("-n", "--nb-exemplaires", \
+                        help="Représente le nombre d'exemplaires d'une même taille à générer", \
+                        action='store', required=False, metavar='NB_EXEMPLAIRES', type=int)
+    parser.add_argument("--seed", \
+                        help="Représente la graine du premier exemplaire, l'exemplaire i utilisant GRAINE + i", \
+                        action='store', required=False, metavar='GRAINE', type=int)
+
+    args = parser.parse_args()
+    if not args.nb_exemplaires:
+        args.nb_exemplaires = 1
+
+    # Generate
+    for i in range(1, args.nb_exemplaires + 1):
+        seed = args.seed + i if args.seed is not None else None
+        generer_exemplaire('b' + str(args.taille) + '_' + str(i) + '.txt', args.taille, seed)
@@ -1,5 +1,9 @@
 
-from typing import List, Callable
+from typing import List, Callable, Tuple, Optional
+from itertools import accumulate
+from bisect import bisect_left, bisect_right
+import heapq
+import numpy as np
 
 # This method computes height for stacked blocks
 def compute_height(blocks: List[List[int]]) -> int:
@@ -26,6 +30,13 @@ class Candidate:
         self._blocks  = blocks
         self._height  = height
         self._tabu    = []
+        # undo log of the moves since the last snapshot, as (start, replaced blocks),
+        #   replaced by a copy of the snapshot's stacked blocks once it holds more
+        #   moves than there are stacked blocks
+        self._log     = []
+        self._snapshot_blocks = None
+        self._snapshot_height = height
+        self.index()
 
     @property
     def height(self) -> int :
@@ -39,35 +50,160 @@ class Candidate:
     def tabu(self) -> List[List[int]] :
         return self._tabu
     
-    # This method pushes a specific block into the candidate's stacked blocks
-    #   and returns the height of the resulting stacked blocks 
-    # If update is True, the resulting stacked blocks become the candidate's
-    #   stacked blocks
-    def push(self, block: List[int], update: bool) -> int:
-        n = len(self._blocks)
+    # This method computes the prefix sums of heights of the stacked blocks, and
+    #   their opposite widths and depths, which are increasing and can be searched
+    #   with the bisect module
+    def index(self) -> None:
+        self._prefix  = list(accumulate((block[0] for block in self._blocks), initial = 0))
+        self._widths  = [-block[1] for block in self._blocks]
+        self._depths  = [-block[2] for block in self._blocks]
 
+    # This method returns the slice [start, end) of the candidate's stacked
+    #   blocks which would be replaced by pushing the given block, and the
+    #   height of the resulting stacked blocks
+    def span(self, block: List[int]) -> Tuple[int, int, int]:
         # in the candidate's stacked blocks, start is the index where to insert
         #   the given block. This index corresponds to the minimum of indices
         #   if we considered pushing width and depth separately
-        start = min([bisect(self._blocks, block,
-                              key = lambda x: x[idx+1]) for idx in range(2)])
+        start = min(bisect_left(self._widths, -block[1]), bisect_left(self._depths, -block[2]))
 
         # in the candidate's stacked blocks, end corresponds to the first index
-        # whose block can stack on the given block
-        end = start
-
-        # while we compute end, the height of the resulting stacked blocks
-        # can also be computed
-        height = self._height + block[0]
-        while end < n :
-            if self._blocks[end][1] < block[1] and self._blocks[end][2] < block[2] :
-                break
-            height -= self._blocks[end][0]
-            end += 1
+        #   whose block can stack on the given block. As widths and depths both
+        #   decrease, it is the maximum of the first indices of strictly lower
+        #   width and strictly lower depth
+        end = max(start, bisect_right(self._widths, -block[1]), bisect_right(self._depths, -block[2]))
+
+        height = self._height + block[0] - (self._prefix[end] - self._prefix[start])
+        return start, end, height
+
+    # This method pushes a specific block into the candidate's stacked blocks
+    #   and returns the height of the resulting stacked blocks 
+    # If update is True, the resulting stacked blocks become the candidate's
+    #   stacked blocks
+    def push(self, block: List[int], update: bool) -> int:
+        start, end, height = self.span(block)
 
         if update:
+            # the slice is replaced in place instead of rebuilding the list
             self._tabu   = self._blocks[start:end]
-            self._blocks = self._blocks[:start] + [block] + self._blocks[end:]
+            self._blocks[start:end] = [block]
+            if self._snapshot_blocks is None :
+                self._log.append((start, self._tabu))
+                if len(self._log) > len(self._blocks) :
+                    self._snapshot_blocks = self.undone()
+                    self._log.clear()
             self._height = height
+            self.index()
   
-        return height
\ No newline at end of file
+        return height
+
+    # This method marks the candidate's stacked blocks as the ones restore()
+    #   returns to, e.g. when the candidate becomes the best solution
+    def snapshot(self) -> None:
+        self._log.clear()
+        self._snapshot_blocks = None
+        self._snapshot_height = self._height
+
+    # This method returns a copy of the candidate's stacked blocks with the moves
+    #   of the undo log undone, in reverse order
+    def undone(self) -> List[List[int]]:
+        blocks = list(self._blocks)
+        for start, replaced in reversed(self._log) :
+            blocks[start:start+1] = replaced
+        return blocks
+
+    # This method goes back to the stacked blocks of the last snapshot
+    def restore(self) -> None:
+        if self._snapshot_blocks is not None :
+            self._blocks[:] = self._snapshot_blocks
+        else :
+            self._blocks[:] = self.undone()
+        self._log.clear()
+        self._snapshot_blocks = None
+        self._height = self._snapshot_height
+        self._tabu   = []
+        self.index()
+
+# Class for the neighbours of a candidate solution for tabu search, with their
+#   gain of height when pushed into the candidate's stacked blocks
+# Pushing a block replaces the slice [start, end) of stacked blocks, so after a
+#   move replacing [s, e), only the neighbours whose slice touches [s, e) have to
+#   be evaluated again, the slices after e being only shifted
+class Neighbourhood:
+    def __init__(self, candidate: Candidate, blocks: List[List[int]]) -> None:
+        self._candidate = candidate
+        self._blocks  = list(blocks)
+        self._ids     = {block: idx for idx, block in enumerate(self._blocks)}
+        n = len(self._blocks)
+        self._active  = np.zeros(n, dtype = bool)
+        self._starts  = np.zeros(n, dtype = np.int64)
+        self._ends    = np.zeros(n, dtype = np.int64)
+        # max-heap of (-gain, stamp, id), entries whose stamp is not
+        #   the last stamp of the neighbour are skipped lazily
+        self._heap    = []
+        self._stamps  = [0]*n
+        self._stamp   = 0
+        self._size    = 0
+
+    def __len__(self) -> int :
+        return self._size
+
+    def __contains__(self, block: List[int]) -> bool :
+        return bool(self._active[self._ids[block]])
+
+    def evaluate(self, idx: int) -> None:
+        start, end, height = self._candidate.span(self._blocks[idx])
+        self._starts[idx] = start
+        self._ends[idx]   = end
+        self._stamp += 1
+        self._stamps[idx] = self._stamp
+        heapq.heappush(self._heap, (self._candidate.height - height, self._stamp, idx))
+        if len(self._heap) > 4 * self._size + 64 :
+            self.compact()
+
+    # This method drops the heap entries of removed neighbours and the outdated
+    #   entries of evaluated again neighbours, which are otherwise only dropped
+    #   when they reach the top of the heap
+    def compact(self) -> None:
+        self._heap = [entry for entry in self._heap
+                      if self._active[entry[2]] and self._stamps[entry[2]] == entry[1]]
+        heapq.heapify(self._heap)
+
+    def add(self, block: List[int]) -> None:
+        idx = self._ids[block]
+        if not self._active[idx] :
+            self._active[idx] = True
+            self._size += 1
+            self.evaluate(idx)
+
+    def remove(self, block: List[int]) -> None:
+        idx = self._ids[block]
+        if self._active[idx] :
+            self._active[idx] = False
+            self._size -= 1
+
+    # This method returns the neighbour with the best gain, if any
+    def best(self) -> Optional[List[int]]:
+        while self._heap :
+            _, stamp, idx = self._heap[0]
+            if self._active[idx] and self._stamps[idx] == stamp :
+                return self._blocks[idx]
+            heapq.heappop(self._heap)
+        return None
+
+    # This method pushes a neighbour into the candidate's stacked blocks
+    #   and updates the other neighbours
+    def move(self, block: List[int]) -> None:
+        start, end, _ = self._candidate.span(block)
+        self.remove(block)
+
+        # neighbours whose slice touches the replaced slice, including the
+        #   stacked blocks just above and below it
+        affected = np.flatnonzero(self._active & (self._starts <= end) & (self._ends >= start))
+        shifted = self._active & (self._starts > end)
+        self._starts[shifted] += 1 - (end - start)
+        self._ends[shifted]   += 1 - (end - start)
+
+        self._candidate.push(block, update = True)
+        for idx in affected.tolist() :
+            self.evaluate(idx)
@@ -10,67 +10,118 @@
 #   Changelog:
 #     10/26/2020 - Initial availability
 #     02/20/2022 - Update the way to read solution
+#     10/18/2026 - Stream the solution and check its blocks against the instance
+#                  Load the instance through the binary cache of loader.py
+#                  Report the running height on stderr every --progress blocks
 #
 #   USAGE:
 #     EN - This script verifies the given solution for consistency 
 #          with class assignment requirements.
-#          Requires Python 3.5 or higher.
+#          Requires Python 3.5 or higher and NumPy.
 #          ./tp.sh -a algorithm -e instance -p | ./verify_tp2.py [refcommand]
 
 #     FR - Ce script vérifie la solution qui lui est donnée pour
 #          conformité avec les exigences du TP.
-#          Python 3.5 ou ultérieur exigé.
+#          Python 3.5 ou ultérieur et NumPy exigés.
 #          ./tp.sh -a algorithme -e exemplaire -p > fichier_solution
-#          ./verify_tp2.py -s fichier_solution
+#          ./verify_tp2.py -s fichier_solution [-e exemplaire]
 #          ou 
-#          python verify_tp2.py -s fichier_solution
+#          python verify_tp2.py -s fichier_solution [-e exemplaire]
+#          ou
+#          ./tp.sh -a algorithme -e exemplaire -p | ./verify_tp2.py -s - -e exemplaire
+#          La hauteur courante est affichée sur stderr tous les N blocs avec --progress N
+#          (1000 par défaut, 0 pour ne pas l'afficher).
 
-import re
+import sys
 import argparse
-
-
-def verify_candidate_stdout(candidate_file, target_pattern):
-    lines = list(filter(lambda elmnt: elmnt != '', open(candidate_file, 'r').read().splitlines()))
-
-    if len(lines) == 0:
-        return 3, 0
-
-    if not bool(re.match(target_pattern, lines[0])):
-        return 1, -1
-    previous_box = [int(dim) for dim in lines[0].split()]
-
-    res_height = previous_box[0]
-    for current_line in lines[1:]:
-        if not bool(re.match(target_pattern, current_line)):
-            return 1, -1
-        
-        current_box = [int(dim) for dim in current_line.split()]
-
-        if previous_box[1] <= current_box[1] or previous_box[2] <= current_box[2]:
-            return 2, -1
-
-        res_height += current_box[0]
-        previous_box = current_box
-
-    return 0, res_height
+import loader
+import numpy as np
+from collections import Counter
+
+
+# Index of the blocks of an instance, a block and its rotations having
+#   the same key : its sorted dimensions
+def block_key(box):
+    return tuple(sorted(box))
+
+def index_instance(instance_file):
+    return Counter(map(tuple, np.sort(loader.load_blocks(instance_file), axis = 1).tolist()))
+
+
+# The solution is read line by line, so that only the previous box and the
+#   running height are kept in memory, whatever the size of the solution
+# The running height is printed on stderr every progress boxes, if progress is not 0
+# Returns the error code, the height of the boxes read so far and the number
+#   of the last line read
+def verify_candidate_stdout(candidate_file, instance_blocks=None, progress=0):
+    f = sys.stdin if candidate_file == '-' else open(candidate_file, 'r')
+    try:
+        previous_box = None
+        res_height = 0
+        nb_boxes = 0
+        line_number = 0
+        for line_number, current_line in enumerate(f, 1):
+            dims = current_line.split()
+            if not dims and current_line.strip('\r\n') == '':
+                continue
+
+            # same format as ^\s*\d+\s+\d+\s+\d+\s*$
+            if len(dims) != 3 or not all(dim.isdecimal() for dim in dims):
+                return 1, res_height, line_number
+            current_box = [int(dim) for dim in dims]
+
+            if previous_box is not None and \
+               (previous_box[1] <= current_box[1] or previous_box[2] <= current_box[2]):
+                return 2, res_height, line_number
+
+            # each block of the instance can be used once, in any rotation
+            if instance_blocks is not None:
+                key = block_key(current_box)
+                if not instance_blocks[key]:
+                    return 4, res_height, line_number
+                instance_blocks[key] -= 1
+
+            res_height += current_box[0]
+            previous_box = current_box
+
+            nb_boxes += 1
+            if progress and nb_boxes % progress == 0:
+                print("Height after " + str(nb_boxes) + " blocks = " + str(res_height) + ".", file=sys.stderr, flush=True)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+    if previous_box is None:
+        return 3, 0, line_number
+    return 0, res_height, line_number
 
 
 if __name__ == "__main__":
-    desired_regex_pattern = "^\\s*\\d+\\s+\\d+\\s+\\d+\\s*$"
     parser = argparse.ArgumentParser()
     parser.add_argument("-s", "--solution", \
-                        help="Représente la solution à vérifier", \
+                        help="Représente la solution à vérifier (- pour l'entrée standard)", \
                         action='store', required=True, metavar='FICHIER_SOLUTION')
+    parser.add_argument("-e", "--exemplaire", \
+                        help="Représente l'exemplaire dont les blocs doivent être utilisés", \
+                        action='store', metavar='FICHIER_EXEMPLAIRE')
+    parser.add_argument("--progress", \
+                        help="Affiche la hauteur courante sur stderr tous les N blocs (0 pour ne pas l'afficher)", \
+                        action='store', metavar='N', type=int, default=1000)
 
     args = parser.parse_args()
 
-    ec, height = verify_candidate_stdout(args.solution , desired_regex_pattern)
+    instance_blocks = index_instance(args.exemplaire) if args.exemplaire else None
+    ec, height, line_number = verify_candidate_stdout(args.solution, instance_blocks, args.progress)
     if ec == 0:
         print("OK, height = " + str(height) + ".")
     elif ec == 1:
-        print("Cannot parse piped output.")
+        print("Cannot parse piped output (line " + str(line_number) + ").")
     elif ec == 2:
-        print("Invalid solution.")
+        print("Invalid solution (line " + str(line_number) + ", height so far = " + str(height) + ").")
     elif ec == 3:
         print("Empty output.")
+    elif ec == 4:
+        print("Block not in the instance (line " + str(line_number) + ", height so far = " + str(height) + ").")
+
+    sys.exit(ec)
 
@@ -8,26 +8,38 @@
 #
 #   Changelog:
 #     28/03/2022 - Initial availability
+#     18/10/2026 - Évaluation vectorisée (NumPy) de toutes les solutions
+#     18/10/2026 - Lecture des exemplaires au format binaire de loader.py
 #
 #   USAGE:
 
 #     FR - Ce script vérifie la solution qui lui est donnée pour
 #          conformité avec les exigences du TP.
-#          Python 3.5 ou ultérieur exigé.
+#          Python 3.5 ou ultérieur et NumPy exigés.
 #          ./tp.sh -e exemplaire -p > fichier_solution
-#          ./check_sol.py -s fichier_solution -e exemplaire
+#          ./check_sol.py -s fichier_solution -e exemplaire [-t]
 #          ou 
-#          python check_sol.py -s fichier_solution -e exemplaire
+#          python check_sol.py -s fichier_solution -e exemplaire [-t]
+#          L'exemplaire peut être au format texte ou au format binaire (voir loader.py).
 
 import sys
 import re
 import math
 import argparse
 
-from numpy import size
+import numpy as np
+
+import loader
+
+# Maximum number of (solution, edge) pairs evaluated at once
+BATCH_SIZE = 1 << 22
 
 
 def load_instance(instance_path):
+    # Binary instances written by loader.py are recognized by their magic
+    if loader.is_binary(instance_path):
+        return loader.load_binary(instance_path)
+
     with open(instance_path,'r') as instance_stream:
         # Process first line which defines problem characteristics
         line_one = next(instance_stream)
@@ -91,37 +103,56 @@ def parse_solution(raw_solution):
 
 
 # Error codes encapsulated into first element of tuple returned: 1 incomplete solution, 2 validity of atoms, 3 bad atoms repartition
+# The solutions are checked all at once as a (number of solutions, number of atoms) array,
+#   the first solution with an error being reported as if they were checked in order
 def check_consistency(solutions, dimensions, atoms_repartition):
+    nb_atoms, nb_types = dimensions[0], dimensions[1]
+
+    #Check the size of the lines, only the solutions before the first incomplete one are checked further
+    nb_complete = next((index for index, solution in enumerate(solutions) if len(solution) != nb_atoms), len(solutions))
+    sols = np.array(solutions[:nb_complete], dtype=np.int64).reshape(nb_complete, nb_atoms)
+
+    #Check if the types are valid types for the problem
+    invalid = sols >= nb_types
+
+    #Count the atoms of each type in each solution, invalid types being counted as type 0
+    #   as their solution is reported anyway
+    offsets = np.arange(nb_complete, dtype=np.int64)[:, None] * nb_types
+    counts = np.bincount((np.where(invalid, 0, sols) + offsets).ravel(), minlength=nb_complete * nb_types)
+    mismatch = counts.reshape(nb_complete, nb_types) != np.array(atoms_repartition, dtype=np.int64)
 
-    for (solution, solution_index) in zip(solutions, range(len(solutions))):
-        nb_atoms = [0 for i in range(len(atoms_repartition))]
-
-        #Check the size of the line
-        if len(solution) != dimensions[0]:
-            return(1, solution_index)
-        
-        for i in solution:
-            #Check if the type of i is a valid type for the problem
-            if i >= dimensions[1]:
-                return(2, solution_index, i)
-            nb_atoms[i]+=1
-        
-        for index, val in enumerate(nb_atoms):
-            if val != atoms_repartition[index]:
-                return(3, solution_index, index, val)
-        
+    bad = invalid.any(axis=1) | mismatch.any(axis=1)
+    if bad.any():
+        solution_index = int(np.argmax(bad))
+        if invalid[solution_index].any():
+            return(2, solution_index, int(sols[solution_index, np.argmax(invalid[solution_index])]))
+        index = int(np.argmax(mismatch[solution_index]))
+        return(3, solution_index, index, int(counts[solution_index * nb_types + index]))
+
+    if nb_complete != len(solutions):
+        return(1, nb_complete)
 
     return 0
 
 
-def compute_objective(solutions, liste_edge, H):
-    solution = solutions[-1]
-    objective = 0
+# Objectives of all the solutions : the sum of H[type of u][type of v] over the edges (u, v),
+#   computed by batches of solutions so that memory stays bounded for dense graphs
+def compute_objectives(solutions, liste_edge, H):
+    H = np.asarray(H, dtype=np.int64)
+    edges = np.asarray(liste_edge, dtype=np.int64).reshape(-1, 2)
+    sols = np.asarray(solutions, dtype=np.int64)
+    objectives = np.zeros(len(sols), dtype=np.int64)
+
+    batch = max(1, BATCH_SIZE // max(1, len(edges)))
+    for start in range(0, len(sols), batch):
+        types = sols[start:start + batch]
+        objectives[start:start + batch] = H[types[:, edges[:, 0]], types[:, edges[:, 1]]].sum(axis=1)
 
-    for edge in liste_edge:
-        objective += H[solution[edge[0]]][solution[edge[1]]]
+    return objectives
 
-    return objective
+
+def compute_objective(solutions, liste_edge, H):
+    return int(compute_objectives(solutions[-1:], liste_edge, H)[0])
 
 
 if __name__ == '__main__':
@@ -133,6 +164,9 @@ if __name__ == '__main__':
     parser.add_argument("-s", "--solution", \
                         help="Représente la solution", \
                         action='store', required=True, metavar='FICHIER_SOLUTION')
+    parser.add_argument("-t", "--trajectoire", \
+                        help="Affiche l'objectif de chacune des solutions", \
+                        action='store_true')
     args = parser.parse_args()
 
     # Load instance corresponding to solution
@@ -181,6 +215,13 @@ if __name__ == '__main__':
 
         sys.exit(1)
 
-    # Satisfied by the solutions' presentation, compute best objective
-    objective = compute_objective(resolution_data, instance_data[2], instance_data[1])
+    # Satisfied by the solutions' presentation, compute the objectives of all solutions
+    objectives = compute_objectives(resolution_data, instance_data[2], instance_data[1])
+    if args.trajectoire:
+        for (solution_index, objective) in enumerate(objectives.tolist()):
+            print("Solution " + str(solution_index) + " : " + str(objective))
+    if len(objectives) > 1 and np.any(np.diff(objectives) > 0):
+        print("Attention : l'objectif augmente entre certaines solutions successives.", file=sys.stderr)
+
+    objective = int(objectives[-1])
     print("OK : la valeur de l'objectif de la dernière (ie, meilleure) solution fournie est de " + str(objective) + ".\n")
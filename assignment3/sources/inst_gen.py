@@ -10,20 +10,207 @@
 #   USAGE :
 #     Ce script génère les exemplaires requis pour le TP3.
 #
-#     $ ./inst_gen.py [-h] -t NB_SITES -k NB_TYPES [-n NB_EXEMPLAIRES]
+#     $ ./inst_gen.py [-h] -t NB_SITES -k NB_TYPES [-n NB_EXEMPLAIRES] [--seed GRAINE] [--sparse]
 #
 #     où :
 #       * NB_SITES est le nombre de site (également le nombre d'atomes)
 #       * NB_TYPES est le nombre de type d'atomes
 #       * NB_EXEMPLAIRES est le nombre d'exemplaires différents requis (par défaut 1).
+#       * GRAINE rend la génération reproductible, l'exemplaire num utilisant la graine GRAINE + num
+#       * --sparse génère les arêtes sans matrice d'adjacence, en mémoire et en temps
+#         proportionnels au nombre d'arêtes, ce qui permet de grands exemplaires
 #
 #     Il est nécessaire de rendre ce script exécutable en utilisant chmod +x
 #     Python 3.5 ou ultérieur recommandé pour lancer ce script.
 
+import os
 import random
 import argparse
+import tempfile
+import shutil
 import numpy as np
 
+DENSITE = 0.2
+# Nombre de positions d'arêtes tirées à la fois en mode sparse
+TAILLE_BLOC = 1 << 20
+
+
+# Génération des arêtes avec une matrice d'adjacence, puis ajout d'arêtes
+#   entre les composantes connexes
+def generer_aretes_dense(taille, densite):
+    NB_ARRETES = 0
+    # Generation matrice adjacence
+    adj = np.zeros((taille,taille))
+    for i in range(taille):
+        for j in range(i+1,taille):
+            if random.random() < densite:
+                adj[i,j] = 1
+                adj[j,i] = 1
+                NB_ARRETES +=1
+
+
+    connex = np.zeros((taille))
+    sec = 1
+    comp = []
+    pile = [0]
+    while True:
+        while pile:
+            ele = pile.pop()
+            comp.append(ele)
+            connex[ele] = 1
+            for j in range(taille):
+                if (adj[ele,j] and connex[j] == 0):
+                    pile.append(j)
+
+        if len(comp) < taille:
+            for autre in range(sec,taille):
+                if connex[autre] == 0:
+                    sec = autre
+                    break
+            pre = comp[random.randint(0,len(comp)-1)]
+            if adj[pre,sec]:
+                print('error')
+            adj[pre,sec] = 1
+            adj[sec,pre] = 1
+            NB_ARRETES += 1
+            pile.append(sec)
+        else:
+            break
+
+    return adj, NB_ARRETES
+
+
+# Racine de l'ensemble de x dans l'union-find, avec compression de chemin
+def trouver(parent, x):
+    racine = x
+    while parent[racine] != racine:
+        racine = parent[racine]
+    while parent[x] != racine:
+        parent[x], x = racine, parent[x]
+    return racine
+
+
+# Génération des arêtes (i, j), i < j, chacune avec la probabilité densite, sans
+#   matrice d'adjacence : les paires sont numérotées ligne par ligne et l'écart
+#   entre deux arêtes successives suit une loi géométrique. Les arêtes sont écrites
+#   au fil de l'eau dans le flux, et la connexité est suivie par union-find jusqu'à
+#   ce que le graphe soit connexe. Les composantes restantes sont ensuite reliées
+#   comme en mode dense. Retourne le nombre d'arêtes écrites
+def generer_aretes_sparse(taille, densite, rng, flux):
+    nb_paires = taille * (taille - 1) // 2
+    lignes = np.arange(taille, dtype=np.int64)
+    # Numéro de la première paire de chaque ligne i : (i, i+1)
+    debuts = lignes * (taille - 1) - lignes * (lignes - 1) // 2
+
+    parent = list(range(taille))
+    nb_composantes = taille
+    NB_ARRETES = 0
+    position = -1
+    while densite > 0 and position < nb_paires:
+        positions = position + np.cumsum(rng.geometric(densite, TAILLE_BLOC))
+        position = int(positions[-1])
+        positions = positions[positions < nb_paires]
+        if not len(positions):
+            break
+
+        i = np.searchsorted(debuts, positions, side='right') - 1
+        j = i + 1 + positions - debuts[i]
+        i, j = i.tolist(), j.tolist()
+        flux.write(''.join(map('{} {}\n'.format, i, j)))
+        NB_ARRETES += len(i)
+
+        if nb_composantes > 1:
+            for a, b in zip(i, j):
+                ra, rb = trouver(parent, a), trouver(parent, b)
+                if ra != rb:
+                    parent[max(ra, rb)] = min(ra, rb)
+                    nb_composantes -= 1
+                    if nb_composantes == 1:
+                        break
+
+    if nb_composantes > 1:
+        # Chaque composante est reliée, par son plus petit site, à un site
+        #   aléatoire des composantes déjà reliées
+        comp = []
+        racine_comp = trouver(parent, 0)
+        for site in range(taille):
+            racine = trouver(parent, site)
+            if racine == racine_comp:
+                comp.append(site)
+            elif racine == site:
+                pre = comp[int(rng.integers(len(comp)))]
+                flux.write('{} {}\n'.format(min(pre, site), max(pre, site)))
+                NB_ARRETES += 1
+                parent[site] = racine_comp
+                comp.append(site)
+    return NB_ARRETES
+
+
+# Nombre d'atomes de chaque type
+def generer_types(taille, types):
+    K_type = [0]*types
+    for _ in range(taille):
+        K_type[random.randint(0,types-1)] += 1
+    # Mélange
+    n_exchange = random.randint(0,10)
+    for _ in range(n_exchange):
+        a = random.randint(0,types-1)
+        b = random.randint(0,types-1)
+        while b == a:
+            b = random.randint(0,types-1)
+        exchange = K_type[a]//2
+        K_type[a] -= exchange
+        K_type[b] += exchange
+    return K_type
+
+
+def generer_h(types):
+    H = np.zeros((types,types))
+    for i in range(types):
+        for j in range(i,types):
+            H[i,j] = int(round(np.random.normal(2,5),0))
+            H[j,i] = H[i,j]
+    return H
+
+
+def ecrire_entete(inst, taille, types, NB_ARRETES, K_type, H):
+    inst.write(f'{taille} {types} {NB_ARRETES}\n')
+    inst.write('\n')
+    inst.write(' '.join([str(k) for k in K_type])+'\n')
+    inst.write('\n')
+    for i in range(types):
+        inst.write(' '.join([str(int(H[i,j])) for j in range(types)])+'\n')
+    inst.write('\n')
+
+
+def generer_exemplaire(chemin, taille, types, seed=None, sparse=False, densite=DENSITE):
+    random.seed(seed)
+    np.random.seed(seed)
+
+    if not sparse:
+        adj, NB_ARRETES = generer_aretes_dense(taille, densite)
+        K_type = generer_types(taille, types)
+        H = generer_h(types)
+        with open(chemin,'w') as inst:
+            ecrire_entete(inst, taille, types, NB_ARRETES, K_type, H)
+            for i in range(taille):
+                for j in range(i+1,taille):
+                    if adj[i,j] == 1:
+                        inst.write(str(i) + ' ' + str(j)+'\n')
+        return
+
+    # Le nombre d'arêtes n'est connu qu'à la fin : elles sont écrites dans un
+    #   fichier temporaire, recopié après l'entête
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryFile('w+', dir=os.path.dirname(os.path.abspath(chemin))) as aretes:
+        NB_ARRETES = generer_aretes_sparse(taille, densite, rng, aretes)
+        K_type = generer_types(taille, types)
+        H = generer_h(types)
+        aretes.seek(0)
+        with open(chemin,'w') as inst:
+            ecrire_entete(inst, taille, types, NB_ARRETES, K_type, H)
+            shutil.copyfileobj(aretes, inst)
+
 
 if __name__ == "__main__":
     # Parse arguments
@@ -37,6 +224,15 @@ if __name__ == "__main__":
     parser.add_argument("-n", "--nb-exemplaires", \
                         help="Représente le nombre d'exemplaires d'une même taille à générer", \
                         action='store', required=False, metavar='NB_EXEMPLAIRES', type=int)
+    parser.add_argument("--seed", \
+                        help="Représente la graine du premier exemplaire, l'exemplaire num utilisant GRAINE + num", \
+                        action='store', required=False, metavar='GRAINE', type=int)
+    parser.add_argument("--sparse", \
+                        help="Génère les arêtes sans matrice d'adjacence, pour les grands exemplaires", \
+                        action='store_true')
+    parser.add_argument("--densite", \
+                        help="Représente la probabilité de chaque arête (par défaut 0.2)", \
+                        action='store', required=False, metavar='DENSITE', type=float, default=DENSITE)
 
     args = parser.parse_args()
     if not args.nb_exemplaires:
@@ -47,80 +243,6 @@ if __name__ == "__main__":
     
     
     for num in range(args.nb_exemplaires):
-        densite = 0.2
-        NB_ARRETES = 0
-        # Generation matrice adjacence
-        adj = np.zeros((args.taille,args.taille))
-        for i in range(args.taille):
-            for j in range(i+1,args.taille):
-                if random.random() < densite:
-                    adj[i,j] = 1
-                    adj[j,i] = 1
-                    NB_ARRETES +=1
-
-
-        connex = np.zeros((args.taille))
-        sec = 1
-        comp = []
-        pile = [0]
-        while True:
-            while pile:
-                ele = pile.pop()
-                comp.append(ele)
-                connex[ele] = 1
-                for j in range(args.taille):
-                    if (adj[ele,j] and connex[j] == 0):
-                        pile.append(j)
-
-            if len(comp) < args.taille:
-                for autre in range(sec,args.taille):
-                    if connex[autre] == 0:
-                        sec = autre
-                        break
-                pre = comp[random.randint(0,len(comp)-1)]
-                if adj[pre,sec]:
-                    print('error')
-                adj[pre,sec] = 1
-                adj[sec,pre] = 1
-                NB_ARRETES += 1
-                pile.append(sec)
-            else:
-                break
-
-        # K Types
-        K_type = [0]*args.types
-        for _ in range(args.taille):
-            K_type[random.randint(0,args.types-1)] += 1
-        # Mélange
-        n_exchange = random.randint(0,10)
-        for _ in range(n_exchange):
-            a = random.randint(0,args.types-1)
-            b = random.randint(0,args.types-1)
-            while b == a:
-                b = random.randint(0,args.types-1)
-            exchange = K_type[a]//2
-            K_type[a] -= exchange
-            K_type[b] += exchange
-
-        # H
-        H = np.zeros((args.types,args.types))
-        for i in range(args.types):
-            for j in range(i,args.types):
-                H[i,j] = int(round(np.random.normal(2,5),0))
-                H[j,i] = H[i,j]
-        
-        
-        with open('N' + str(args.taille) + '_K' + str(args.types) + '_' + str(num),'w') as inst:
-            inst.write(f'{args.taille} {args.types} {NB_ARRETES}\n')
-            inst.write('\n')
-            inst.write(' '.join([str(k) for k in K_type])+'\n')
-            inst.write('\n')
-            for i in range(args.types):
-                inst.write(' '.join([str(int(H[i,j])) for j in range(args.types)])+'\n')
-            inst.write('\n')
-            for i in range(args.taille):
-                for j in range(i+1,args.taille):
-                    if adj[i,j] == 1:
-                        inst.write(str(i) + ' ' + str(j)+'\n')
-
-                
+        seed = args.seed + num if args.seed is not None else None
+        generer_exemplaire('N' + str(args.taille) + '_K' + str(args.types) + '_' + str(num),
+                           args.taille, args.types, seed, args.sparse, args.densite)
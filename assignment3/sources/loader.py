@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+# INF8775 - Analyse et conception d'algorithmes
+#   TP3 - Configuration d'atomes
+#
+#   USAGE :
+#     Ce script convertit des exemplaires au format binaire, lu directement
+#     (memory-mapped) par check_sol.py et solver.py à la place du format texte.
+#
+#     $ ./loader.py exemplaire [exemplaire ...]
+#
+#     Chaque exemplaire est converti dans le fichier exemplaire.bin.
+#     Python 3.5 ou ultérieur et NumPy exigés.
+
+import sys
+
+import numpy as np
+
+# Binary format, little-endian : the magic, n, k and m as int64, the k type
+#   counts and the k x k matrix H as int64, then the m edges as int32 pairs
+MAGIC = b'ATOMES01'
+HEADER_SIZE = len(MAGIC) + 3 * 8
+BINARY_SUFFIX = '.bin'
+
+
+def is_binary(instance_path):
+    with open(instance_path, 'rb') as instance_stream:
+        return instance_stream.read(len(MAGIC)) == MAGIC
+
+
+def write_binary(binary_path, dimensions, H, liste_edge, atoms_repartition):
+    nb_atoms, nb_types, nb_edges = dimensions
+    with open(binary_path, 'wb') as binary_stream:
+        binary_stream.write(MAGIC)
+        binary_stream.write(np.array([nb_atoms, nb_types, nb_edges], dtype='<i8').tobytes())
+        binary_stream.write(np.array(atoms_repartition, dtype='<i8').tobytes())
+        binary_stream.write(np.array(H, dtype='<i8').tobytes())
+        binary_stream.write(np.asarray(liste_edge, dtype='<i4').reshape(nb_edges, 2).tobytes())
+
+
+# Same result as check_sol.load_instance, 1 for an invalid instance, the
+#   edges being an (m,2) array mapped on the file instead of a list
+def load_binary(instance_path):
+    header = np.fromfile(instance_path, dtype='<i8', count=3, offset=len(MAGIC))
+    if len(header) != 3:
+        return 1
+    nb_atoms, nb_types, nb_edges = (int(value) for value in header)
+
+    tables = np.fromfile(instance_path, dtype='<i8', count=nb_types + nb_types * nb_types, offset=HEADER_SIZE)
+    if len(tables) != nb_types + nb_types * nb_types:
+        return 1
+    atoms_repartition = tables[:nb_types].tolist()
+    H = tables[nb_types:].reshape(nb_types, nb_types).tolist()
+
+    offset = HEADER_SIZE + 8 * len(tables)
+    try:
+        if nb_edges:
+            liste_edge = np.memmap(instance_path, dtype='<i4', mode='r', offset=offset, shape=(nb_edges, 2))
+        else:
+            liste_edge = np.zeros((0, 2), dtype='<i4')
+    except ValueError:
+        return 1
+    if len(liste_edge) and (liste_edge.min() < 0 or liste_edge.max() >= nb_atoms):
+        return 1
+
+    return [nb_atoms, nb_types, nb_edges], H, liste_edge, atoms_repartition
+
+
+if __name__ == '__main__':
+    from check_sol import load_instance
+
+    for instance_path in sys.argv[1:]:
+        instance_data = load_instance(instance_path)
+        if instance_data == 1:
+            print("Erreur : l'exemplaire " + instance_path + " a un format non valide.", file=sys.stderr)
+            sys.exit(1)
+        write_binary(instance_path + BINARY_SUFFIX, *instance_data)
+        print(instance_path + BINARY_SUFFIX)
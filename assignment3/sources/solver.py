@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+# INF8775 - Analyse et conception d'algorithmes
+#   TP3 - Configuration d'atomes
+#
+#   USAGE :
+#     Ce script résout un exemplaire par recherche tabou et affiche une ligne
+#     par amélioration, la dernière étant la meilleure solution trouvée.
+#
+#     $ ./solver.py -e exemplaire [-p] [--temps SECONDES] [--seed GRAINE]
+#     $ ./solver.py -e exemplaire -p > fichier_solution
+#     $ ./check_sol.py -e exemplaire -s fichier_solution
+#
+#     Sans -p, seule la valeur de l'objectif est affichée à chaque amélioration.
+#     L'exemplaire peut être au format texte ou au format binaire (voir loader.py).
+#     Python 3.5 ou ultérieur et NumPy exigés.
+
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from check_sol import load_instance
+
+
+# Compressed sparse row adjacency of an undirected graph : the neighbours of u are
+#   indices[indptr[u]:indptr[u + 1]], sorted
+def build_csr(nb_sites, edges):
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    src = np.concatenate((edges[:, 0], edges[:, 1]))
+    dst = np.concatenate((edges[:, 1], edges[:, 0]))
+    order = np.lexsort((dst, src))
+    indptr = np.zeros(nb_sites + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=nb_sites), out=indptr[1:])
+    return indptr, dst[order]
+
+
+# Configuration of atoms on the sites with, for every site, the number of its
+#   neighbours of each type, so that the objective change of a swap is computed
+#   in O(k) and a swap is applied in O(deg)
+class Configuration:
+    def __init__(self, H, indptr, indices, types):
+        self.H = np.asarray(H, dtype=np.int64)
+        self.indptr = indptr
+        self.indices = indices
+        self.types = np.array(types, dtype=np.int64)
+        nb_sites, nb_types = len(self.types), len(self.H)
+
+        # Sorted keys u * n + v of the directed edges, to test adjacency of many pairs at once
+        sources = np.repeat(np.arange(nb_sites, dtype=np.int64), np.diff(indptr))
+        self.edge_keys = sources * nb_sites + indices
+
+        self.counts = np.bincount(sources * nb_types + self.types[indices],
+                                  minlength=nb_sites * nb_types).reshape(nb_sites, nb_types)
+        self.objective = int((self.counts * self.H[self.types]).sum()) // 2
+
+    def neighbours(self, u):
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+    def adjacent(self, u, v):
+        keys = u * len(self.types) + v
+        positions = np.minimum(np.searchsorted(self.edge_keys, keys), len(self.edge_keys) - 1)
+        return self.edge_keys[positions] == keys
+
+    # Objective changes of swapping the types a of u and b of v, for arrays of pairs :
+    #   counts[u].(H[b] - H[a]) + counts[v].(H[a] - H[b]), and when u and v are adjacent,
+    #   the edge (u, v) which keeps its value is taken out : - H[b][b] - H[a][a] + 2 H[a][b]
+    def swap_deltas(self, u, v):
+        a, b = self.types[u], self.types[v]
+        diff = self.H[b] - self.H[a]
+        deltas = (self.counts[u] * diff).sum(axis=1) - (self.counts[v] * diff).sum(axis=1)
+        correction = 2 * self.H[a, b] - self.H[a, a] - self.H[b, b]
+        return deltas + np.where(self.adjacent(u, v), correction, 0)
+
+    def swap(self, u, v, delta):
+        a, b = self.types[u], self.types[v]
+        # neighbours of a site are distinct, so the in-place fancy updates are exact
+        neighbours = self.neighbours(u)
+        self.counts[neighbours, a] -= 1
+        self.counts[neighbours, b] += 1
+        neighbours = self.neighbours(v)
+        self.counts[neighbours, b] -= 1
+        self.counts[neighbours, a] += 1
+        self.types[u], self.types[v] = b, a
+        self.objective += int(delta)
+
+
+# Tabu search : at each iteration, a sample of random swaps of atoms of different
+#   types is evaluated at once, and the best one whose sites are not tabu (or which
+#   improves the best solution) is applied. The swapped sites stay tabu for a number
+#   of iterations. The search stops at the deadline, or after max_fails iterations
+#   without improvement. Each improvement is passed to the callback
+def tabu_search(config, rng, callback, neighbourhood_size=1000, max_fails=5000, deadline=None):
+    nb_sites = len(config.types)
+    tenure = max(1, nb_sites // 20)
+    tabu_until = np.zeros(nb_sites, dtype=np.int64)
+
+    best_objective = config.objective
+    best_types = config.types.copy()
+    callback(best_types, best_objective)
+
+    iteration = 0
+    fails = 0
+    while fails < max_fails and (deadline is None or time.time() < deadline):
+        iteration += 1
+        fails += 1
+
+        u = rng.integers(0, nb_sites, neighbourhood_size)
+        v = rng.integers(0, nb_sites, neighbourhood_size)
+        pairs = config.types[u] != config.types[v]
+        u, v = u[pairs], v[pairs]
+        if not len(u):
+            continue
+
+        deltas = config.swap_deltas(u, v)
+        allowed = ((tabu_until[u] < iteration) & (tabu_until[v] < iteration)) | \
+                  (config.objective + deltas < best_objective)
+        if not allowed.any():
+            continue
+        best = int(np.argmin(np.where(allowed, deltas, np.iinfo(np.int64).max)))
+
+        config.swap(u[best], v[best], deltas[best])
+        tabu_until[u[best]] = tabu_until[v[best]] = iteration + tenure
+
+        if config.objective < best_objective:
+            best_objective = config.objective
+            best_types = config.types.copy()
+            fails = 0
+            callback(best_types, best_objective)
+
+    return best_types, best_objective
+
+
+if __name__ == '__main__':
+    # Parse arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-e", "--exemplaire", \
+                        help="Représente l'exemplaire à résoudre", \
+                        action='store', required=True, metavar='FICHIER_EXEMPLAIRE')
+    parser.add_argument("-p", "--print", \
+                        help="Affiche chaque solution améliorante plutôt que son objectif", \
+                        action='store_true')
+    parser.add_argument("--temps", \
+                        help="Arrête la recherche après ce temps plutôt qu'après une stagnation", \
+                        action='store', metavar='SECONDES', type=float)
+    parser.add_argument("--seed", \
+                        help="Graine du générateur aléatoire", \
+                        action='store', metavar='GRAINE', type=int, default=0)
+    args = parser.parse_args()
+
+    instance_data = load_instance(args.exemplaire)
+    if instance_data == 1:
+        print("Erreur : l'exemplaire a un format non valide.", file=sys.stderr)
+        sys.exit(1)
+    dimensions, H, liste_edge, atoms_repartition = instance_data
+
+    def report(types, objective):
+        if args.print:
+            print(' '.join(map(str, types.tolist())), flush=True)
+        else:
+            print(objective, flush=True)
+
+    # Random initial solution respecting the number of atoms of each type
+    rng = np.random.default_rng(args.seed)
+    types = rng.permutation(np.repeat(np.arange(dimensions[1]), atoms_repartition))
+    indptr, indices = build_csr(dimensions[0], liste_edge)
+    config = Configuration(H, indptr, indices, types)
+
+    deadline = time.time() + args.temps if args.temps is not None else None
+    tabu_search(config, rng, report, deadline=deadline, max_fails=sys.maxsize if deadline else 5000)
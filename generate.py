@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+# Generation of the instances of the three assignments in parallel
+#
+#   USAGE :
+#     $ ./generate.py [-a tp1 tp2 tp3] [-j JOBS] [--seed SEED] [--sizes SIZE ...]
+#                     [--samples N] [--types K] [--sparse] [--out DIR] [--force]
+#
+#   Each instance has its own seed, derived from the base seed, the assignment,
+#   its parameters and its number, so that the same corpus is generated whatever
+#   the number of processes. Files are written atomically, and a manifest in each
+#   output directory records the parameters and seed of every generated file, so
+#   that instances already generated with the same parameters and seed are skipped.
+#   Existing files missing from the manifest are kept unless --force is given.
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MANIFEST = 'manifest.json'
+
+# For each assignment : the generator, the default output directory, the default
+#   sizes (with the number of atom types for tp3), the default number of instances
+#   per size, the number of the first instance and the file name of an instance
+ASSIGNMENTS = {
+    'tp1': {'generator': os.path.join(ROOT, 'assignment1', 'sources', 'inst_gen.py'),
+            'out': os.path.join(ROOT, 'assignment1', 'data'),
+            'sizes': [(n, None) for n in (1000, 5000, 10000, 50000, 100000, 500000)],
+            'samples': 5, 'first': 0,
+            'name': lambda n, k, num : f'N{n}_{num}'},
+    'tp2': {'generator': os.path.join(ROOT, 'assignment2', 'sources', 'inst_gen.py'),
+            'out': os.path.join(ROOT, 'assignment2', 'data'),
+            'sizes': [(n, None) for n in (100, 500, 1000, 5000, 10000, 50000, 100000)],
+            'samples': 10, 'first': 1,
+            'name': lambda n, k, num : f'b{n}_{num}.txt'},
+    'tp3': {'generator': os.path.join(ROOT, 'assignment3', 'sources', 'inst_gen.py'),
+            'out': os.path.join(ROOT, 'assignment3', 'data'),
+            'sizes': [(100, 4), (500, 6), (1000, 6)],
+            'samples': 1, 'first': 0,
+            'name': lambda n, k, num : f'N{n}_K{k}_{num}'},
+}
+
+_generators = dict()
+
+# This method imports the inst_gen.py script of an assignment, once per process,
+#   under a name of its own as the three scripts have the same name
+def load_generator(assignment: str):
+    if assignment not in _generators :
+        spec = importlib.util.spec_from_file_location(f'inst_gen_{assignment}', ASSIGNMENTS[assignment]['generator'])
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _generators[assignment] = module
+    return _generators[assignment]
+
+# This method derives the seed of an instance from the base seed and the
+#   description of the instance
+def instance_seed(base_seed: int, assignment: str, params: dict, num: int) -> int :
+    key = json.dumps([base_seed, assignment, params, num], sort_keys = True)
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:4], 'little')
+
+# This method generates one instance in a temporary file, then renames it
+def generate(assignment: str, path: str, params: dict, seed: int) -> str :
+    tmp_path = path + '.tmp'
+    try :
+        if assignment == 'tp3' :
+            load_generator(assignment).generer_exemplaire(tmp_path, params['size'], params['types'],
+                                                          seed, params['sparse'])
+        else :
+            load_generator(assignment).generer_exemplaire(tmp_path, params['size'], seed)
+        os.replace(tmp_path, path)
+    finally :
+        if os.path.exists(tmp_path) :
+            os.remove(tmp_path)
+    return path
+
+def load_manifest(out_dir: str) -> Dict[str, dict] :
+    try :
+        with open(os.path.join(out_dir, MANIFEST), 'r') as f :
+            return json.load(f)
+    except (OSError, ValueError) :
+        return dict()
+
+def save_manifest(out_dir: str, manifest: Dict[str, dict]) -> None :
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + '.tmp', 'w') as f :
+        json.dump(manifest, f, indent = 2, sort_keys = True)
+    os.replace(path + '.tmp', path)
+
+# This method lists the instances of an assignment as (file name, manifest entry)
+def plan(assignment: str, sizes: List[Tuple[int, int]], samples: int, base_seed: int, sparse: bool) -> List[Tuple[str, dict]] :
+    spec = ASSIGNMENTS[assignment]
+    instances = []
+    for size, types in sizes :
+        params = {'size': size}
+        if assignment == 'tp3' :
+            params.update({'types': types, 'sparse': sparse})
+        for num in range(spec['first'], spec['first'] + samples) :
+            entry = {'assignment': assignment, 'params': params, 'seed': instance_seed(base_seed, assignment, params, num)}
+            instances.append((spec['name'](size, types, num), entry))
+    return instances
+
+if __name__ == "__main__" :
+    # parse arguments
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-a", \
+                        help="assignments whose instances are generated (all by default)", \
+                        dest="assignments", \
+                        action='store', nargs='+', choices=list(ASSIGNMENTS), default=list(ASSIGNMENTS))
+    parser.add_argument("-j", \
+                        help="number of processes", \
+                        dest="jobs", \
+                        action='store', type=int, default=os.cpu_count())
+    parser.add_argument("--seed", \
+                        help="base seed of the corpus", \
+                        dest="seed", \
+                        action='store', type=int, default=0)
+    parser.add_argument("--sizes", \
+                        help="sizes to generate instead of the default ones", \
+                        dest="sizes", \
+                        action='store', type=int, nargs='+', metavar = 'SIZE')
+    parser.add_argument("--samples", \
+                        help="number of instances per size instead of the default one", \
+                        dest="samples", \
+                        action='store', type=int)
+    parser.add_argument("--types", \
+                        help="number of atom types of the tp3 instances with --sizes", \
+                        dest="types", \
+                        action='store', type=int, default=6)
+    parser.add_argument("--sparse", \
+                        help="generates the tp3 instances without adjacency matrix", \
+                        dest="sparse", \
+                        action='store_true')
+    parser.add_argument("--out", \
+                        help="output directory instead of the data directory of each assignment", \
+                        dest="out_dir", \
+                        action='store', metavar = 'DIR')
+    parser.add_argument("--force", \
+                        help="overwrites existing files missing from the manifest", \
+                        dest="force", \
+                        action='store_true')
+    args = parser.parse_args()
+
+    # instances to generate, grouped by output directory
+    manifests = dict()
+    tasks = []
+    for assignment in args.assignments :
+        spec = ASSIGNMENTS[assignment]
+        out_dir = args.out_dir or spec['out']
+        os.makedirs(out_dir, exist_ok = True)
+        manifest = manifests.setdefault(out_dir, load_manifest(out_dir))
+        sizes = [(size, args.types) for size in args.sizes] if args.sizes else spec['sizes']
+        samples = args.samples or spec['samples']
+        for name, entry in plan(assignment, sizes, samples, args.seed, args.sparse) :
+            path = os.path.join(out_dir, name)
+            if os.path.exists(path) :
+                if manifest.get(name) == entry :
+                    continue
+                if name not in manifest and not args.force :
+                    print(f'# {path} : kept, not in the manifest (--force to overwrite)', file = sys.stderr)
+                    continue
+            tasks.append((out_dir, name, entry))
+
+    # the largest instances are generated first to balance the processes
+    tasks.sort(key = lambda task : task[2]['params']['size'], reverse = True)
+    with ProcessPoolExecutor(max_workers = max(1, args.jobs)) as executor :
+        futures = {executor.submit(generate, entry['assignment'], os.path.join(out_dir, name),
+                                   entry['params'], entry['seed']) : (out_dir, name, entry)
+                   for out_dir, name, entry in tasks}
+        for future in as_completed(futures) :
+            out_dir, name, entry = futures[future]
+            print(future.result())
+            manifests[out_dir][name] = entry
+            save_manifest(out_dir, manifests[out_dir])